@@ -1,55 +1,84 @@
+import functools
+
 import dash
 from dash import html, dcc
 import plotly.express as px
-import pandas as pd
 from dash import Input, Output
 
-dash.register_page(__name__, path='/US-dashboard')
-
-S_P500 = pd.read_csv('Data/US_Data/SP500.csv')
-
-fig_SP500 = px.line(S_P500, x='Time', y='Price', title='S&P 500 Closing Prices Over Time')
-
-
-NASDAQ = pd.read_csv('Data/US_Data/NASDAQ100.csv')
-
-fig_NASDAQ = px.line(NASDAQ, x='Time', y='Price', title='NASDAQ 100 Closing Prices Over Time')
-
-
-GDP= pd.read_csv('Data/US_Data/GDP.csv')
-
-fig_GDP = px.line(GDP, x='Time', y='GDP', title='US GDP Over Time')
-
-
-Inflation= pd.read_csv('Data/US_Data/Inflation_Dataset.csv')
-
-fig_Inflation = px.line(Inflation, x='Time', y='Inflation', title='US Inflation Over Time')
-
-Unemployment= pd.read_csv('Data/US_Data/Unemployement_Dataset.csv')
-
-fig_Unemployment = px.line(Unemployment, x='Time', y='Unemployement_Rate', title='US Unemployment Over Time')
-
-
-Debts= pd.read_csv('Data/US_Data/Debts.csv')
-
-fig_Debts = px.line(Debts, x='Time', y='Debts_Rate', title='US Debt Over Time')
-
+import datasets
+from services import downsample, static_figures
+from services.figure_cache import figure_cache
+from services.page_guard import guarded_layout
 
+dash.register_page(__name__, path='/US-dashboard')
 
-layout= html.Div([
-    html.H2('US Dashboard'),
-    html.H3('S&P 500 Closing Prices Over Time'),
-    dcc.Graph(figure=fig_SP500),
-    html.H3('NASDAQ 100 Closing Prices Over Time'),
-    dcc.Graph(figure=fig_NASDAQ),
-    html.H3('US GDP Over Time'),
-    dcc.Graph(figure=fig_GDP),
-    html.H3('US Inflation Over Time'),
-    dcc.Graph(figure=fig_Inflation),
-    html.H3('US Unemployment Over Time'),
-    dcc.Graph(figure=fig_Unemployment),
-    html.H3('US Debt Over Time'),
-    dcc.Graph(figure=fig_Debts),
-    html.H3('Conclusion'),
-    html.P('Thanks to the data we can see that the impact of the covid on the US economy wasn\'t as severe as expected. Indeed, the covid has enabled a huge growth of tech compagny like amazon, google and the US economy is drived by those big compagny so the impact of the crisis was limited by that but if the look to the unemployement rate, we can see that the US struggled more on social impact of the crisis with a longer time to go back to the previous level.')
-])
\ No newline at end of file
+# Daily price series: downsampled to the visible window, re-queried on zoom
+PRICE_SERIES = {
+    'sp500': ('us_sp500', 'S&P 500 Closing Prices Over Time'),
+    'nasdaq100': ('us_nasdaq100', 'NASDAQ 100 Closing Prices Over Time'),
+}
+
+
+@figure_cache.memoize("us.price_figure", selection=False, x_range_arg=1,
+                       datasets=[name for name, _ in PRICE_SERIES.values()])
+def _price_figure(series, x_range):
+    name, title = PRICE_SERIES[series]
+    prices = downsample.window(datasets.get(name), 'Time', x_range)
+    fig = px.line(downsample.downsample(prices, 'Time', 'Price'), x='Time', y='Price', title=title)
+    fig.update_layout(uirevision=series)  # keep the user's zoom across re-queries
+    return fig
+
+
+# Macro series: static figures, serialized once and served as cached,
+# pre-compressed JSON (see services/static_figures.py)
+MACRO_FIGURES = {
+    'us.gdp': ('us_gdp', 'GDP', 'US GDP Over Time'),
+    'us.inflation': ('us_inflation', 'Inflation', 'US Inflation Over Time'),
+    'us.unemployment': ('us_unemployment', 'Unemployement_Rate', 'US Unemployment Over Time'),
+    'us.debts': ('us_debts', 'Debts_Rate', 'US Debt Over Time'),
+}
+
+
+def _macro_figure(key):
+    name, y, title = MACRO_FIGURES[key]
+    return px.line(datasets.get(name), x='Time', y=y, title=title)
+
+
+for _key in MACRO_FIGURES:
+    static_figures.register(_key, functools.partial(_macro_figure, _key),
+                            datasets=[MACRO_FIGURES[_key][0]])
+
+
+@guarded_layout
+def layout(**kwargs):
+    return html.Div([
+        html.H2('US Dashboard'),
+        html.H3('S&P 500 Closing Prices Over Time'),
+        dcc.Graph(id='sp500-graph'),
+        html.H3('NASDAQ 100 Closing Prices Over Time'),
+        dcc.Graph(id='nasdaq-graph'),
+        html.H3('US GDP Over Time'),
+        static_figures.graph('us.gdp'),
+        html.H3('US Inflation Over Time'),
+        static_figures.graph('us.inflation'),
+        html.H3('US Unemployment Over Time'),
+        static_figures.graph('us.unemployment'),
+        html.H3('US Debt Over Time'),
+        static_figures.graph('us.debts'),
+        html.H3('Conclusion'),
+        html.P('Thanks to the data we can see that the impact of the covid on the US economy wasn\'t as severe as expected. Indeed, the covid has enabled a huge growth of tech compagny like amazon, google and the US economy is drived by those big compagny so the impact of the crisis was limited by that but if the look to the unemployement rate, we can see that the US struggled more on social impact of the crisis with a longer time to go back to the previous level.')
+    ])
+
+
+@dash.callback(
+    Output('sp500-graph', 'figure'),
+    Input('sp500-graph', 'relayoutData'))
+def update_sp500_graph(relayout_data):
+    return _price_figure('sp500', downsample.x_range_from_relayout(relayout_data))
+
+
+@dash.callback(
+    Output('nasdaq-graph', 'figure'),
+    Input('nasdaq-graph', 'relayoutData'))
+def update_nasdaq_graph(relayout_data):
+    return _price_figure('nasdaq100', downsample.x_range_from_relayout(relayout_data))
@@ -1,31 +1,29 @@
 import dash
 from dash import html, dcc, Input, Output
-import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+
+from datasets import worldbank, worldometer
+from services import downsample
+from services.page_guard import guarded_layout
 
 # --------------------------------------------------
-# Load Datasets
+# Datasets
 # --------------------------------------------------
-GDP_df = pd.read_csv("Data/World_Data/API_NY.GDP.MKTP.KD.ZG_DS2_en_csv_v2_23243.csv", skiprows=4)
-Inflation_df = pd.read_csv("Data/World_Data/API_FP.CPI.TOTL.ZG_DS2_en_csv_v2_23195.csv", skiprows=4)
-Unemployment_df = pd.read_csv("Data/World_Data/API_SL.UEM.TOTL.ZS_DS2_en_csv_v2_25091.csv", skiprows=4)
-Health_df = pd.read_csv("Data/World_Data/worldometer_coronavirus_daily_data.csv") 
+# Read inside the callbacks (memoized by the registry), not at import: the
+# app starts even if a file is missing. GDP, inflation and unemployment come
+# from one pre-melted long table (datasets/worldbank.py) shared with the
+# global page.
 
 # --------------------------------------------------
 # Clean and Prepare Data
 # --------------------------------------------------
-Health_df.columns = Health_df.columns.str.strip().str.lower()
-
-# Year columns for economic datasets
-year_cols = [col for col in GDP_df.columns if col.isdigit()]
-year_cols_filtered = [col for col in year_cols if int(col) >= 2017]
+# Year range for economic datasets
+FIRST_YEAR = 2017
 
 # Focused countries
 countries_focus = ["China", "Japan", "South Korea"]
 
-# Ensure date is datetime for health data
-Health_df["date"] = pd.to_datetime(Health_df["date"], errors="coerce")
-
 # --------------------------------------------------
 # Register Dash Page
 # --------------------------------------------------
@@ -34,36 +32,51 @@ dash.register_page(__name__, path="/asia-dashboard")
 # --------------------------------------------------
 # Layout
 # --------------------------------------------------
-layout = html.Div([
-    html.H1("🌏 Asia Economic & Health Dashboard", style={'textAlign': 'center', 'marginBottom': 30}),
-
-    # GDP Section
-    html.H3("GDP Growth Rate Over Time (%)"),
-    dcc.Graph(id="gdp-graph-asia"),
-
-    # Inflation Section
-    html.H3("Inflation Rate Over Time (%)"),
-    dcc.Graph(id="inflation-graph-asia"),
-
-    # Unemployment Section
-    html.H3("Unemployment Rate Over Time (%)"),
-    dcc.Graph(id="unemployment-graph-asia"),
-
-    # Health Section
-    html.H3("COVID-19 Health Statistics"),
-    dcc.RadioItems(
-        id="health-metric-radio-asia",
-        options=[
-            {"label": "Daily New Cases", "value": "daily_new_cases"},
-            {"label": "Active Cases", "value": "active_cases"},
-            {"label": "Daily New Deaths", "value": "daily_new_deaths"},
-        ],
-        value="daily_new_cases",
-        inline=True,
-        style={"marginBottom": "10px"}
-    ),
-    dcc.Graph(id="health-graph-asia"),
-])
+@guarded_layout
+def layout(**kwargs):
+    return html.Div([
+        html.H1("🌏 Asia Economic & Health Dashboard", style={'textAlign': 'center', 'marginBottom': 30}),
+
+        # GDP Section
+        html.H3("GDP Growth Rate Over Time (%)"),
+        dcc.Graph(id="gdp-graph-asia"),
+
+        # Inflation Section
+        html.H3("Inflation Rate Over Time (%)"),
+        dcc.Graph(id="inflation-graph-asia"),
+
+        # Unemployment Section
+        html.H3("Unemployment Rate Over Time (%)"),
+        dcc.Graph(id="unemployment-graph-asia"),
+
+        # Health Section
+        html.H3("COVID-19 Health Statistics"),
+        dcc.RadioItems(
+            id="health-metric-radio-asia",
+            # Raw columns plus the derived metrics precomputed at ingest
+            options=[{"label": label, "value": value}
+                     for value, label in worldometer.metric_labels().items()],
+            value="daily_new_cases",
+            inline=True,
+            style={"marginBottom": "10px"}
+        ),
+        dcc.RadioItems(
+            id="health-granularity-asia",
+            options=[
+                {"label": "Auto", "value": "auto"},
+                {"label": "Daily", "value": "daily"},
+                {"label": "Weekly", "value": "weekly"},
+                {"label": "Monthly", "value": "monthly"},
+            ],
+            value="auto",
+            inline=True,
+            style={"marginBottom": "10px"}
+        ),
+        # Every metric at the chosen granularity (daily rows downsampled), sent
+        # once: the figure is drawn in the browser (clientside callback below)
+        dcc.Store(id="health-data-asia"),
+        dcc.Graph(id="health-graph-asia"),
+    ])
 
 # --------------------------------------------------
 # Callbacks
@@ -73,12 +86,8 @@ layout = html.Div([
     Input("gdp-graph-asia", "id")  # dummy input to trigger callback
 )
 def update_gdp_asia(_):
-    filtered = GDP_df[GDP_df["Country Name"].isin(countries_focus)]
-    gdp_melted = filtered.melt(
-        id_vars=["Country Name"],
-        value_vars=year_cols_filtered,
-        var_name="Year",
-        value_name="GDP Growth (%)"
+    gdp_melted = worldbank.indicator_frame(
+        "gdp", countries_focus, since_year=FIRST_YEAR, value_name="GDP Growth (%)"
     )
     fig = px.line(
         gdp_melted,
@@ -94,12 +103,8 @@ def update_gdp_asia(_):
     Input("inflation-graph-asia", "id")
 )
 def update_inflation_asia(_):
-    filtered = Inflation_df[Inflation_df["Country Name"].isin(countries_focus)]
-    inflation_melted = filtered.melt(
-        id_vars=["Country Name"],
-        value_vars=year_cols_filtered,
-        var_name="Year",
-        value_name="Inflation (%)"
+    inflation_melted = worldbank.indicator_frame(
+        "inflation", countries_focus, since_year=FIRST_YEAR, value_name="Inflation (%)"
     )
     fig = px.line(
         inflation_melted,
@@ -115,12 +120,8 @@ def update_inflation_asia(_):
     Input("unemployment-graph-asia", "id")
 )
 def update_unemployment_asia(_):
-    filtered = Unemployment_df[Unemployment_df["Country Name"].isin(countries_focus)]
-    unemployment_melted = filtered.melt(
-        id_vars=["Country Name"],
-        value_vars=year_cols_filtered,
-        var_name="Year",
-        value_name="Unemployment (%)"
+    unemployment_melted = worldbank.indicator_frame(
+        "unemployment", countries_focus, since_year=FIRST_YEAR, value_name="Unemployment (%)"
     )
     fig = px.line(
         unemployment_melted,
@@ -131,24 +132,78 @@ def update_unemployment_asia(_):
     )
     return fig
 
+def _values(column):
+    # Rounded; whole numbers without ".0" and None (JSON null) for missing values
+    values = column.astype("float64").round(2).tolist()
+    return [None if v != v else int(v) if v.is_integer() else v for v in values]
+
+
 @dash.callback(
+    Output("health-data-asia", "data"),
+    Input("health-granularity-asia", "value")
+)
+def update_health_data_asia(granularity):
+    """Columnar payload of every metric: per country, its dates and one
+    array of values per metric."""
+    if granularity == "auto":
+        granularity = worldometer.auto_granularity(countries_focus)
+    # Daily rows come from these countries' partitions only, coarser ones from the rollups
+    labels = worldometer.metric_labels()
+    Health_df = worldometer.health_table(countries_focus, granularity)
+    filtered = Health_df[Health_df["date"].dt.year >= 2017]
+    series = []
+    for country, rows in filtered.groupby("country", observed=True, sort=False):
+        rows = rows.sort_values("date").reset_index(drop=True)
+        values = rows[list(labels)]
+        if granularity == "daily":
+            # Each metric downsampled on its own, on the dates any of them keeps;
+            # the points a metric drops are nulls, bridged by connectgaps
+            kept = {metric: downsample.downsample(rows, "date", metric).index for metric in labels}
+            values = values.apply(lambda col: col.where(col.index.isin(kept[col.name])))
+            dates = sorted(set().union(*kept.values()))
+            rows, values = rows.loc[dates], values.loc[dates]
+        series.append({
+            "name": str(country),
+            "date": rows["date"].dt.strftime("%Y-%m-%d").tolist(),
+            **{metric: _values(values[metric]) for metric in labels},
+        })
+    return {
+        "granularity": granularity,
+        "series": series,
+        "labels": labels,
+        "stats": worldometer.DEFAULT_STAT,
+        # Default template (the one plotly.express used), so the chart looks as before
+        "layout": go.Figure().to_plotly_json()["layout"],
+    }
+
+
+# Switching metric is drawn in the browser from the payload, without a request
+dash.clientside_callback(
+    """
+    function(metric, payload) {
+        if (!payload || !payload.labels[metric]) { return window.dash_clientside.no_update; }
+        let title = payload.labels[metric] + " Over Time (China, Japan, South Korea)";
+        if (payload.granularity !== "daily") {
+            title += " — " + payload.granularity + " " + payload.stats[metric];
+        }
+        const data = payload.series.map(s => ({
+            type: "scatter", mode: "lines", name: s.name, legendgroup: s.name,
+            x: s.date, y: s[metric], connectgaps: payload.granularity === "daily",
+            hovertemplate: "country=" + s.name + "<br>date=%{x}<br>" + metric + "=%{y}<extra></extra>",
+        }));
+        const layout = Object.assign({}, payload.layout, {
+            title: {text: title},
+            xaxis: {title: {text: "Date"}},
+            yaxis: {title: {text: payload.labels[metric]}},
+            legend: {title: {text: "country"}, tracegroupgap: 0},
+        });
+        return {data: data, layout: layout};
+    }
+    """,
     Output("health-graph-asia", "figure"),
-    Input("health-metric-radio-asia", "value")
+    Input("health-metric-radio-asia", "value"),
+    Input("health-data-asia", "data"),
 )
-def update_health_asia(metric):
-    filtered = Health_df[
-        (Health_df["country"].isin(countries_focus)) &
-        (Health_df["date"].dt.year >= 2017)
-    ]
-    fig = px.line(
-        filtered,
-        x="date",
-        y=metric,
-        color="country",
-        title=f"{metric.replace('_', ' ').title()} Over Time (China, Japan, South Korea)"
-    )
-    fig.update_layout(xaxis_title="Date", yaxis_title=metric.replace("_", " ").title())
-    return fig
 
 # --------------------------------------------------
 # Run standalone (optional)
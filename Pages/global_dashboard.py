@@ -1,32 +1,24 @@
 import dash
 from dash import html, dcc, Input, Output
-import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 
-# --------------------------------------------------
-# Load Datasets
-# --------------------------------------------------
-GDP_df = pd.read_csv("Data/World_Data/API_NY.GDP.MKTP.KD.ZG_DS2_en_csv_v2_23243.csv", skiprows=4)
-Inflation_df = pd.read_csv("Data/World_Data/API_FP.CPI.TOTL.ZG_DS2_en_csv_v2_23195.csv", skiprows=4)
-Unemployment_df = pd.read_csv("Data/World_Data/API_SL.UEM.TOTL.ZS_DS2_en_csv_v2_25091.csv", skiprows=4)
-Health_df = pd.read_csv("Data/World_Data/worldometer_coronavirus_daily_data.csv") 
+from datasets import worldbank, worldometer
+from services import downsample
+from services.figure_cache import figure_cache
+from services.trace_patch import TraceSet
+from services.page_guard import guarded_layout
 
 # --------------------------------------------------
-# Clean and Prepare Data
+# Datasets
 # --------------------------------------------------
-Health_df.columns = Health_df.columns.str.strip().str.lower()
+# Loaded on first visit (see layout below), not at import: the app starts
+# even if a file is missing. GDP, inflation and unemployment come from one
+# pre-melted long table (datasets/worldbank.py) shared with the Asia page;
+# health data is read per country from its partitions (datasets/worldometer.py).
 
-# Year columns for economic datasets
-year_cols = [col for col in GDP_df.columns if col.isdigit()]
 # Only years >= 2017
-year_cols_filtered = [col for col in year_cols if int(col) >= 2017]
-
-# List of countries
-countries = GDP_df["Country Name"].dropna().unique()
-
-# Ensure date is datetime for health data
-Health_df["date"] = pd.to_datetime(Health_df["date"], errors="coerce")
-health_countries = Health_df["country"].dropna().unique()
+FIRST_YEAR = 2017
 
 # --------------------------------------------------
 # Register Dash Page (only if app exists)
@@ -37,153 +29,167 @@ dash.register_page(__name__, path="/global-dashboard")
 # --------------------------------------------------
 # Layout
 # --------------------------------------------------
-layout = html.Div([
-    html.H1("🌍 Global Economic & Health Dashboard", style={'textAlign': 'center', 'marginBottom': 30}),
-
-    # GDP Section
-    html.H3("Global GDP Growth Rate Over Time (%)"),
-    dcc.Dropdown(
-        id="country-dropdown-gdp-global",
-        options=[{"label": c, "value": c} for c in countries],
-        value=["France", "India", "United States"],
-        multi=True,
-        style={"width": "60%"}
-    ),
-    dcc.Graph(id="gdp-graph-global"),
-
-    # Inflation Section
-    html.H3("Global Inflation Rate Over Time (%)"),
-    dcc.Dropdown(
-        id="country-dropdown-inflation-global",
-        options=[{"label": c, "value": c} for c in countries],
-        value=["France", "India", "United States"],
-        multi=True,
-        style={"width": "60%"}
-    ),
-    dcc.Graph(id="inflation-graph-global"),
-
-    # Unemployment Section
-    html.H3("Global Unemployment Rate Over Time (%)"),
-    dcc.Dropdown(
-        id="country-dropdown-unemployment-global",
-        options=[{"label": c, "value": c} for c in countries],
-        value=["France", "India", "United States"],
-        multi=True,
-        style={"width": "60%"}
-    ),
-    dcc.Graph(id="unemployment-graph-global"),
-
-    # Health Section
-    html.H3("Global COVID-19 Health Statistics"),
-    dcc.Dropdown(
-        id="country-dropdown-health-global",
-        options=[{"label": c, "value": c} for c in health_countries],
-        value=["India", "France", "United States"],
-        multi=True,
-        style={"width": "60%"}
-    ),
-    dcc.RadioItems(
-        id="health-metric-radio-global",
-        options=[
-            {"label": "Daily New Cases", "value": "daily_new_cases"},
-            {"label": "Active Cases", "value": "active_cases"},
-            {"label": "Daily New Deaths", "value": "daily_new_deaths"},
-        ],
-        value="daily_new_cases",
-        inline=True,
-        style={"marginBottom": "10px"}
-    ),
-    dcc.Graph(id="health-graph-global"),
-])
+@guarded_layout
+def layout(**kwargs):
+    # List of countries
+    countries = worldbank.countries()
+    health_countries = worldometer.countries()
+
+    return html.Div([
+        html.H1("🌍 Global Economic & Health Dashboard", style={'textAlign': 'center', 'marginBottom': 30}),
+
+        # GDP Section
+        html.H3("Global GDP Growth Rate Over Time (%)"),
+        dcc.Dropdown(
+            id="country-dropdown-gdp-global",
+            options=[{"label": c, "value": c} for c in countries],
+            value=["France", "India", "United States"],
+            multi=True,
+            style={"width": "60%"}
+        ),
+        dcc.Graph(id="gdp-graph-global"),
+        TraceSet.store("gdp-graph-global"),
+
+        # Inflation Section
+        html.H3("Global Inflation Rate Over Time (%)"),
+        dcc.Dropdown(
+            id="country-dropdown-inflation-global",
+            options=[{"label": c, "value": c} for c in countries],
+            value=["France", "India", "United States"],
+            multi=True,
+            style={"width": "60%"}
+        ),
+        dcc.Graph(id="inflation-graph-global"),
+        TraceSet.store("inflation-graph-global"),
+
+        # Unemployment Section
+        html.H3("Global Unemployment Rate Over Time (%)"),
+        dcc.Dropdown(
+            id="country-dropdown-unemployment-global",
+            options=[{"label": c, "value": c} for c in countries],
+            value=["France", "India", "United States"],
+            multi=True,
+            style={"width": "60%"}
+        ),
+        dcc.Graph(id="unemployment-graph-global"),
+        TraceSet.store("unemployment-graph-global"),
+
+        # Health Section
+        html.H3("Global COVID-19 Health Statistics"),
+        dcc.Dropdown(
+            id="country-dropdown-health-global",
+            options=[{"label": c, "value": c} for c in health_countries],
+            value=["India", "France", "United States"],
+            multi=True,
+            style={"width": "60%"}
+        ),
+        dcc.RadioItems(
+            id="health-metric-radio-global",
+            # Raw columns plus the derived metrics precomputed at ingest
+            options=[{"label": label, "value": value}
+                     for value, label in worldometer.metric_labels().items()],
+            value="daily_new_cases",
+            inline=True,
+            style={"marginBottom": "10px"}
+        ),
+        dcc.RadioItems(
+            id="health-granularity-global",
+            options=[
+                {"label": "Auto", "value": "auto"},
+                {"label": "Daily", "value": "daily"},
+                {"label": "Weekly", "value": "weekly"},
+                {"label": "Monthly", "value": "monthly"},
+            ],
+            value="auto",
+            inline=True,
+            style={"marginBottom": "10px"}
+        ),
+        dcc.Graph(id="health-graph-global"),
+    ])
 
 # --------------------------------------------------
 # Callbacks
 # --------------------------------------------------
 
-@dash.callback(
-    Output("gdp-graph-global", "figure"),
-    [Input("country-dropdown-gdp-global", "value")]
-)
-def update_gdp(selected_countries):
-    filtered = GDP_df[GDP_df["Country Name"].isin(selected_countries)]
-    gdp_melted = filtered.melt(
-        id_vars=["Country Name"],
-        value_vars=year_cols_filtered,
-        var_name="Year",
-        value_name="GDP Growth (%)"
-    )
-    fig = px.line(
-        gdp_melted,
-        x="Year",
-        y="GDP Growth (%)",
-        color="Country Name",
-        title="GDP Growth Rate Over Time"
+# World Bank indicators: one cached trace per country; a selection change
+# sends only the added and removed traces (services/trace_patch.py)
+INDICATOR_CHARTS = {
+    "gdp": ("GDP Growth (%)", "GDP Growth Rate Over Time"),
+    "inflation": ("Inflation (%)", "Inflation Rate Over Time"),
+    "unemployment": ("Unemployment (%)", "Unemployment Rate Over Time"),
+}
+
+
+def _indicator_trace(indicator, country):
+    value_name, _ = INDICATOR_CHARTS[indicator]
+    rows = worldbank.indicator_frame(indicator, [country], since_year=FIRST_YEAR, value_name=value_name)
+    if rows.empty:
+        return None
+    return go.Scatter(
+        x=rows["Year"], y=rows[value_name], name=country, legendgroup=country,
+        mode="lines", line={"dash": "solid"}, showlegend=True,
+        hovertemplate=f"Country Name={country}<br>Year=%{{x}}<br>{value_name}=%{{y}}<extra></extra>",
     )
-    return fig
 
 
-@dash.callback(
-    Output("inflation-graph-global", "figure"),
-    [Input("country-dropdown-inflation-global", "value")]
-)
-def update_inflation(selected_countries):
-    filtered = Inflation_df[Inflation_df["Country Name"].isin(selected_countries)]
-    inflation_melted = filtered.melt(
-        id_vars=["Country Name"],
-        value_vars=year_cols_filtered,
-        var_name="Year",
-        value_name="Inflation (%)"
-    )
-    fig = px.line(
-        inflation_melted,
-        x="Year",
-        y="Inflation (%)",
-        color="Country Name",
-        title="Inflation Rate Over Time"
+def _indicator_traces(indicator):
+    value_name, title = INDICATOR_CHARTS[indicator]
+    return TraceSet(
+        f"global.{indicator}",
+        lambda country: _indicator_trace(indicator, country),
+        layout={
+            "title": {"text": title},
+            "xaxis": {"title": {"text": "Year"}},
+            "yaxis": {"title": {"text": value_name}},
+            "legend": {"title": {"text": "Country Name"}, "tracegroupgap": 0},
+        },
+        datasets=["world_indicators"],
     )
-    return fig
 
 
-@dash.callback(
-    Output("unemployment-graph-global", "figure"),
-    [Input("country-dropdown-unemployment-global", "value")]
-)
-def update_unemployment(selected_countries):
-    filtered = Unemployment_df[Unemployment_df["Country Name"].isin(selected_countries)]
-    unemployment_melted = filtered.melt(
-        id_vars=["Country Name"],
-        value_vars=year_cols_filtered,
-        var_name="Year",
-        value_name="Unemployment (%)"
-    )
-    fig = px.line(
-        unemployment_melted,
-        x="Year",
-        y="Unemployment (%)",
-        color="Country Name",
-        title="Unemployment Rate Over Time"
-    )
-    return fig
+update_gdp = _indicator_traces("gdp").connect("country-dropdown-gdp-global", "gdp-graph-global")
+update_inflation = _indicator_traces("inflation").connect(
+    "country-dropdown-inflation-global", "inflation-graph-global")
+update_unemployment = _indicator_traces("unemployment").connect(
+    "country-dropdown-unemployment-global", "unemployment-graph-global")
 
 
 @dash.callback(
     Output("health-graph-global", "figure"),
     [Input("country-dropdown-health-global", "value"),
-     Input("health-metric-radio-global", "value")]
+     Input("health-metric-radio-global", "value"),
+     Input("health-granularity-global", "value"),
+     Input("health-graph-global", "relayoutData")]
 )
-def update_health(selected_countries, metric):
-    filtered = Health_df[
-        (Health_df["country"].isin(selected_countries)) &
-        (Health_df["date"].dt.year >= 2017)
-    ]
+def update_health(selected_countries, metric, granularity, relayout_data):
+    # Zooming re-queries the visible window at full point budget
+    x_range = downsample.x_range_from_relayout(relayout_data)
+    if granularity == "auto":
+        # Wide ranges come from the weekly/monthly rollups, narrow ones from daily rows
+        granularity = worldometer.auto_granularity(selected_countries, x_range)
+    return _health_figure(selected_countries, metric, x_range, granularity)
+
+
+@figure_cache.memoize("global.update_health", x_range_arg=2,
+                       datasets=["world_health", "world_health_weekly", "world_health_monthly"])
+def _health_figure(selected_countries, metric, x_range, granularity):
+    Health_df = worldometer.health_frame(selected_countries, metric, granularity)
+    filtered = Health_df[Health_df["date"].dt.year >= 2017]
+    filtered = downsample.window(filtered, "date", x_range)
+    if granularity == "daily":
+        filtered = downsample.downsample(filtered, "date", metric, group="country")
+    title = f"{worldometer.METRIC_LABELS[metric]} Over Time"
+    if granularity != "daily":
+        title += f" — {granularity} {worldometer.DEFAULT_STAT[metric]}"
     fig = px.line(
         filtered,
         x="date",
         y=metric,
         color="country",
-        title=f"{metric.replace('_', ' ').title()} Over Time"
+        title=title
     )
-    fig.update_layout(xaxis_title="Date", yaxis_title=metric.replace("_", " ").title())
+    fig.update_layout(xaxis_title="Date", yaxis_title=worldometer.METRIC_LABELS[metric],
+                      uirevision="health")
     return fig
 
 # --------------------------------------------------
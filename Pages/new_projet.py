@@ -3,42 +3,25 @@
 # 1. INSTALLATION ET IMPORTATIONS
 # -------------------------------------------------------------------------------------
 
+import functools
+
 import dash
-from dash import dcc, html, Input, Output, State, callback
+from dash import dcc, html, Input, Output, State
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import os 
 import numpy as np
-import json 
-
-# --- Chemins de vos fichiers locaux (CORRIGÉS) ---
-# Le dossier 'data' doit se trouver dans le même répertoire que ce script.
-DATA_DIR = "Data/Djamel_Data" 
-OXCGRT_FILE = 'stringency_index_avg.xlsx' 
-UNEMPLOYMENT_FILE = 'unemployment_data.csv'
-
-# Construction des chemins complets (Compatible Windows/Linux/macOS)
-OXCGRT_PATH = os.path.join(DATA_DIR, OXCGRT_FILE)
-UNEMPLOYMENT_PATH = os.path.join(DATA_DIR, UNEMPLOYMENT_FILE)
-
-START_YEAR = 2020
-END_YEAR = 2023 
-
-# --- SÉLECTION SPÉCIFIQUE DES 9 PAYS ---
-TARGET_COUNTRIES_LIST = [
-    {'CountryName': 'France', 'IncomeGroup_Custom': '1 - Haut Revenu'},
-    {'CountryName': 'United Kingdom', 'IncomeGroup_Custom': '1 - Haut Revenu'},
-    {'CountryName': 'Japan', 'IncomeGroup_Custom': '1 - Haut Revenu'},
-    {'CountryName': 'Brazil', 'IncomeGroup_Custom': '2 - Émergent (Interm. Sup.)'},
-    {'CountryName': 'China', 'IncomeGroup_Custom': '2 - Émergent (Interm. Sup.)'},
-    {'CountryName': 'South Africa', 'IncomeGroup_Custom': '2 - Émergent (Interm. Sup.)'},
-    {'CountryName': 'Ethiopia', 'IncomeGroup_Custom': '3 - Faible Revenu'},
-    {'CountryName': 'Sudan', 'IncomeGroup_Custom': '3 - Faible Revenu'},
-    {'CountryName': 'Yemen', 'IncomeGroup_Custom': '3 - Faible Revenu'},
-]
-df_target = pd.DataFrame(TARGET_COUNTRIES_LIST)
-target_countries = df_target['CountryName'].tolist()
+
+import datasets
+from datasets import djamel, oxcgrt
+from services import jobs
+from services.page_guard import guarded_layout
+from services.result_store import default_store
+
+# --- Données ---
+# Le pipeline OxCGRT x ILOSTAT (chargement, melt, agrégation mensuelle, fusion)
+# est défini dans datasets/djamel.py. Il tourne en tâche de fond dans un pool
+# de processus (services/jobs.py), une seule fois par processus.
 
 
 # 2. INITIALISATION DE L'APPLICATION DASH
@@ -50,198 +33,372 @@ dash.register_page(__name__, path="/djamel-dashboard")
 # 3. MISE EN PAGE : CORRIGÉE
 # -------------------------------------------------------------------------------------
 
-layout = html.Div([ 
-    html.H2("Analyse Dynamique des 9 Pays : Rigueur Politique vs. Taux de Chômage", style={'textAlign': 'center', 'color': '#8B4513'}),
-    html.P("Comparaison mensuelle des indices de politique et du chômage pour les trois groupes de revenus ciblés.", style={'textAlign': 'center', 'marginBottom': '10px'}),
-
-    dcc.Store(id='stored-data'),
-    html.Div(id='loading-error-message', style={'textAlign': 'center', 'color': 'red', 'fontSize': '1.2em'}),
-
-    # CONTRÔLES (Utilisation correcte de style et children)
-    html.Div(
-        id='controls-container', 
-        style={
-            'display': 'none', 
-            'padding': '10px', 
-            'backgroundColor': '#f0f0f0', 
-            'borderRadius': '5px', 
-            'margin-bottom': '20px', 
-            'width': '80%', 
-            'margin-left': 'auto', 
-            'margin-right': 'auto'
-        }, 
-        children=[
-            html.Div([
-                html.Label("1. Indicateur Politique (Axe X):", style={'fontWeight': 'bold'}),
-                dcc.Dropdown(
-                    id='x-axis-selector',
-                    options=[{'label': 'Indice de Rigueur (OxCGRT)', 'value': 'Stringency_Index'}],
-                    value='Stringency_Index',
-                    clearable=False
-                )
-            ], style={'width': '30%', 'display': 'inline-block', 'margin-right': '5%'}),
-
-            html.Div([
-                html.Label("2. Regroupement (Couleur) :", style={'fontWeight': 'bold'}),
-                dcc.Dropdown(
-                    id='color-selector',
-                    options=[
-                        {'label': 'Groupe de Revenu', 'value': 'IncomeGroup_Custom'},
-                        {'label': 'Pays', 'value': 'CountryName'},
-                        {'label': 'Année', 'value': 'Year:nominal'}
-                    ],
-                    value='IncomeGroup_Custom',
-                    clearable=False
-                )
-            ], style={'width': '30%', 'display': 'inline-block', 'margin-right': '5%'}),
-
-            html.Div([
-                html.Label("3. Animation Temporelle :", style={'fontWeight': 'bold'}),
-                dcc.Dropdown(
-                    id='animation-selector',
-                    options=[
-                        {'label': 'Année-Mois', 'value': 'Year_Month'},
-                        {'label': 'Année', 'value': 'Year'}
-                    ],
-                    value='Year_Month',
-                    clearable=False
-                )
-            ], style={'width': '30%', 'display': 'inline-block'}),
-        ] 
-    ),
-
-    # GRAPHIQUE PRINCIPAL
-    dcc.Graph(id='main-scatter-plot', style={'height': '70vh'}),
-]) 
-
-
-# 4. CALLBACK 1 : Chargement et Stockage des Données
+@guarded_layout
+def layout(**kwargs):
+    return html.Div([
+        html.H2("Analyse Dynamique par Pays : Rigueur Politique vs. Taux de Chômage", style={'textAlign': 'center', 'color': '#8B4513'}),
+        html.P("Comparaison mensuelle des indices de politique et du chômage des pays choisis, par groupe de revenu.", style={'textAlign': 'center', 'marginBottom': '10px'}),
+
+        dcc.Store(id='stored-data'),
+        dcc.Store(id='scatter-data'),  # colonnes des pays choisis, dessinées côté navigateur
+        # Tâche de fond de l'ETL : id de la tâche et sondage de son avancement
+        dcc.Store(id='etl-job'),
+        dcc.Interval(id='etl-poll', interval=500, disabled=True),
+        html.Div(id='etl-progress', style={'textAlign': 'center', 'marginBottom': '10px'}),
+        html.Div(id='loading-error-message', style={'textAlign': 'center', 'color': 'red', 'fontSize': '1.2em'}),
+
+        # CONTRÔLES (Utilisation correcte de style et children)
+        html.Div(
+            id='controls-container',
+            style={
+                'display': 'none',
+                'padding': '10px',
+                'backgroundColor': '#f0f0f0',
+                'borderRadius': '5px',
+                'margin-bottom': '20px',
+                'width': '80%',
+                'margin-left': 'auto',
+                'margin-right': 'auto'
+            },
+            children=[
+                html.Div([
+                    html.Label("1. Indicateur Politique (Axe X):", style={'fontWeight': 'bold'}),
+                    dcc.Dropdown(
+                        id='x-axis-selector',
+                        # Un indice OxCGRT par colonne de la table : changer d'indice ne relit aucun XLSX
+                        options=[{'label': label, 'value': col} for col, (_, label) in oxcgrt.INDICES.items()],
+                        value='Stringency_Index',
+                        clearable=False
+                    )
+                ], style={'width': '30%', 'display': 'inline-block', 'margin-right': '5%'}),
+
+                html.Div([
+                    html.Label("2. Regroupement (Couleur) :", style={'fontWeight': 'bold'}),
+                    dcc.Dropdown(
+                        id='color-selector',
+                        options=[
+                            {'label': 'Groupe de Revenu', 'value': 'IncomeGroup_Custom'},
+                            {'label': 'Pays', 'value': 'CountryName'},
+                            {'label': 'Année', 'value': 'Year:nominal'}
+                        ],
+                        value='IncomeGroup_Custom',
+                        clearable=False
+                    )
+                ], style={'width': '30%', 'display': 'inline-block', 'margin-right': '5%'}),
+
+                html.Div([
+                    html.Label("3. Animation Temporelle :", style={'fontWeight': 'bold'}),
+                    dcc.Dropdown(
+                        id='animation-selector',
+                        options=[
+                            {'label': 'Année-Mois', 'value': 'Year_Month'},
+                            {'label': 'Année', 'value': 'Year'}
+                        ],
+                        value='Year_Month',
+                        clearable=False
+                    )
+                ], style={'width': '30%', 'display': 'inline-block'}),
+
+                # Tous les pays sont calculés : choisir des pays filtre la table, sans relancer l'ETL
+                html.Div([
+                    html.Label("4. Pays :", style={'fontWeight': 'bold'}),
+                    dcc.Dropdown(
+                        id='country-selector',
+                        options=[{'label': c, 'value': c} for c in djamel.target_countries],
+                        value=djamel.target_countries,
+                        multi=True
+                    )
+                ], style={'marginTop': '10px'}),
+            ]
+        ),
+
+        # GRAPHIQUE PRINCIPAL
+        dcc.Graph(id='main-scatter-plot', style={'height': '70vh'}),
+
+        # ANALYSE : corrélations rigueur -> chômage (précalculées, datasets/djamel.py)
+        html.Div(id='correlation-tables', style={'width': '80%', 'margin': 'auto'}),
+    ])
+
+
+# 4. CALLBACK 1 : Chargement et Stockage des Données (en tâche de fond)
 # -------------------------------------------------------------------------------------
 
+# Le dcc.Store ne contient qu'une clé : les données restent côté serveur.
+TABLE = 'djamel_policy_unemployment'
+
+CONTROLS_STYLE = {
+    'padding': '10px', 
+    'backgroundColor': '#f0f0f0', 
+    'borderRadius': '5px', 
+    'margin-bottom': '20px', 
+    'width': '80%', 
+    'margin-left': 'auto', 
+    'margin-right': 'auto'
+}
+
+
+def _store(df, stamps=None):
+    """Appelé dans ce processus à la fin de la tâche : mémorise la table et renvoie sa clé.
+
+    `stamps` : état des fichiers sources au lancement de la tâche, pour que
+    le rechargement en arrière-plan reconstruise la table s'ils changent."""
+    datasets.install(TABLE, df, stamps)
+    return default_store.put(df, prefix='djamel')
+
+
+def _stored_key():
+    return default_store.put(datasets.get(TABLE), prefix='djamel')
+
+
+def _resolve(key):
+    """Retrouve le DataFrame d'une clé (recalculé si ce processus ne la connaît pas)."""
+    df = default_store.get(key)
+    if df is None:
+        df = default_store.get(_stored_key())
+    return df
+
+
+@dash.callback(
+    Output('etl-job', 'data'),
+    Output('etl-poll', 'disabled'),
+    Input('stored-data', 'id') 
+)
+def load_and_store_data(_):
+    """Lance l'ETL dans le pool de processus (services/jobs.py) et renvoie l'id de la tâche.
+
+    La requête ne bloque plus pendant la lecture de l'XLSX ; des visites
+    simultanées partagent la même tâche."""
+    if datasets.attach_shared(TABLE):
+        # Déjà calculée dans ce processus, ou présente dans l'instantané partagé
+        # des workers (datasets/shared.py) : rien à lancer
+        return jobs.completed(TABLE, _stored_key()), False
+    on_done = functools.partial(_store, stamps=datasets.input_stamps(TABLE))
+    return jobs.submit(TABLE, djamel.build_policy_unemployment, on_done=on_done), False
+
+
 @dash.callback(
     Output('stored-data', 'data'),
     Output('loading-error-message', 'children'),
     Output('controls-container', 'style'), 
-    Input('stored-data', 'id') 
+    Output('etl-progress', 'children'),
+    Output('etl-poll', 'disabled', allow_duplicate=True),
+    Output('scatter-data', 'data', allow_duplicate=True),
+    Input('etl-poll', 'n_intervals'),
+    State('etl-job', 'data'),
+    prevent_initial_call=True
 )
-def load_and_store_data(_):
-    """Charge, prépare et stocke les données dans le dcc.Store."""
-    try:
-        # Utilisation de encoding='latin-1' pour résoudre l'erreur Unicode
-        
-        # --- 2.1. Chargement de l'Indice de Rigueur (OxCGRT) ---
-        df_oxcgrt = pd.read_excel(OXCGRT_PATH,sheet_name='Sheet1') 
-        id_vars_oxcgrt = ['country_code', 'country_name', 'region_code', 'region_name', 'jurisdiction']
-        
-        df_oxcgrt = df_oxcgrt.melt(
-            id_vars=id_vars_oxcgrt, var_name='Date_Raw', value_name='Stringency_Index'
-        )
-        
-        df_oxcgrt['Date'] = pd.to_datetime(df_oxcgrt['Date_Raw'], format='%d%b%Y', errors='coerce')
-        df_oxcgrt = df_oxcgrt.dropna(subset=['Date', 'Stringency_Index'])
-        
-        df_oxcgrt['Year'] = df_oxcgrt['Date'].dt.year
-        df_oxcgrt['Year_Month'] = df_oxcgrt['Date'].dt.to_period('M').astype(str)
-        df_oxcgrt = df_oxcgrt.rename(columns={'country_name': 'CountryName'})
-        
-        df_policy_monthly = df_oxcgrt.groupby(['CountryName', 'Year_Month', 'Year'])['Stringency_Index'].mean().reset_index()
-        df_policy_monthly = df_policy_monthly[df_policy_monthly['CountryName'].isin(target_countries)]
-        
-        # --- 2.2. Chargement des Données de Chômage (ILOSTAT) ---
-        df_unemployment_raw = pd.read_csv(UNEMPLOYMENT_PATH, skiprows=4, encoding='latin-1')
-
-        df_unemployment = df_unemployment_raw.melt(
-            id_vars=['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code'],
-            value_vars=[str(y) for y in range(START_YEAR, END_YEAR + 1)],
-            var_name='Year',
-            value_name='Unemployment_Rate'
-        ).dropna(subset=['Unemployment_Rate'])
-
-        df_unemployment['Year'] = df_unemployment['Year'].astype(int)
-        df_unemployment = df_unemployment.rename(columns={'Country Name': 'CountryName'})
-        df_unemployment = df_unemployment[df_unemployment['CountryName'].isin(target_countries)][['CountryName', 'Year', 'Unemployment_Rate']]
-
-        # --- 2.3. Fusion Finale ---
-        df_final = pd.merge(df_policy_monthly, df_unemployment, on=['CountryName', 'Year'], how='left')
-        df_final = df_final.dropna(subset=['Unemployment_Rate', 'Stringency_Index'])
-        df_final = pd.merge(df_final, df_target, on='CountryName', how='left')
-        
-        if df_final.empty:
-             raise ValueError("Le DataFrame final est vide après le filtrage. Vérifiez la correspondance des noms de pays.")
-
-        # Sérialiser en JSON
-        data_json = df_final.to_json(orient='split')
-        print(f"Fusion terminée. Nombre d'observations : {len(df_final)}. Prêt pour l'affichage.")
-        
-        # Succès : Retourne les données et affiche les contrôles
-        return data_json, "", {
-            'padding': '10px', 
-            'backgroundColor': '#f0f0f0', 
-            'borderRadius': '5px', 
-            'margin-bottom': '20px', 
-            'width': '80%', 
-            'margin-left': 'auto', 
-            'margin-right': 'auto'
-        }
+def poll_etl(_, job_id):
+    """Suit la tâche : barre de progression, puis clé des données et contrôles."""
+    status = jobs.status(job_id)
+
+    if status['state'] == 'running':
+        progress = [
+            html.Progress(value=str(status['progress']), max='1', style={'width': '40%'}),
+            html.Div(status['message'] or "En attente…"),
+        ]
+        return dash.no_update, "", dash.no_update, progress, False, dash.no_update
 
-    except (FileNotFoundError, ValueError) as e:
-        error_msg = f"❌ ERREUR DE CHARGEMENT : {e}"
-        print(error_msg)
-        # Échec : Retourne des données vides et cache les contrôles
-        return None, error_msg, {'display': 'none'}
-    except Exception as e:
-        error_msg = f"❌ ERREUR FATALE LORS DU TRAITEMENT : {e}"
-        print(error_msg)
-        return None, error_msg, {'display': 'none'}
+    if status['state'] == 'done':
+        # Succès : Retourne la clé et affiche les contrôles (le graphique suit via update_scatter_data)
+        return status['result'], "", CONTROLS_STYLE, None, True, dash.no_update
+
+    error_msg = f"❌ ERREUR DE CHARGEMENT : {status['message'] or 'tâche introuvable'}"
+    print(error_msg)
+    # Échec : pas de données, contrôles cachés, et le graphique affiche l'erreur
+    return dash.no_update, error_msg, {'display': 'none'}, None, True, {'status': 'failed'}
+
+
+@dash.callback(
+    Output('country-selector', 'options'),
+    Input('stored-data', 'data')
+)
+def update_country_options(data_key):
+    """Tous les pays de la table, une fois les données disponibles."""
+    if data_key is None:
+        return dash.no_update
+    countries = sorted(_resolve(data_key)['CountryName'].unique())
+    return [{'label': c, 'value': c} for c in countries]
 
 
 # 5. CALLBACK 2 : Mise à Jour du Graphique à partir des Données Stockées (CORRIGÉ)
 # -------------------------------------------------------------------------------------
+# Le serveur envoie une fois les colonnes utiles des pays choisis ; les choix
+# d'axe X, de couleur et d'animation ne changent que la présentation et sont
+# dessinés dans le navigateur (callback clientside), sans aller-retour.
+
+SCATTER_COLUMNS = ['CountryName', 'IncomeGroup_Custom', 'Year', 'Year_Month', 'Unemployment_Rate', *oxcgrt.INDICES]
+
+
+def _columnar(df):
+    """Colonnes compactes : texte encodé en dictionnaire (valeurs triées + codes), nombres arrondis."""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind in 'fiu':
+            columns[col] = values.astype('float64').round(3).astype(object).where(values.notna(), None).tolist()
+        else:
+            codes, uniques = pd.factorize(values.astype(str), sort=True)
+            columns[col] = {'values': uniques.tolist(), 'codes': codes.tolist()}
+    return columns
+
 
 @dash.callback(
-    Output('main-scatter-plot', 'figure'),
-    [
-        Input('x-axis-selector', 'value'),
-        Input('color-selector', 'value'),
-        Input('animation-selector', 'value')
-    ], # Correction de la SyntaxError: unterminated string literal
-    State('stored-data', 'data') 
+    Output('scatter-data', 'data'),
+    Input('stored-data', 'data'),  # envoyé quand la tâche de fond livre les données
+    Input('country-selector', 'value')
 )
-def update_graph(x_col, color_col, animation_col, data_json):
-    
-    if data_json is None:
-        return go.Figure().update_layout(title="ERREUR: Le chargement des données a échoué. Voir le message d'erreur ci-dessus.", height=500)
-    
-    df_final = pd.read_json(data_json, orient='split')
-    df_final['Year'] = df_final['Year'].astype(str)
-    
-    plot_color_col = color_col.split(':')[0]
-    
-    fig = px.scatter(
-        df_final, 
-        x=x_col, 
-        y='Unemployment_Rate',
-        color=plot_color_col,
-        animation_frame=animation_col,
-        hover_data=['CountryName', 'IncomeGroup_Custom', 'Year', 'Unemployment_Rate'],
-        size=x_col, 
-        title=f"Rigueur Politique vs. Taux de Chômage ({df_final['Year'].min()} - {df_final['Year'].max()})",
-        labels={
+def update_scatter_data(data_key, countries):
+    if data_key is None:
+        # Tâche de fond en cours : en cas d'échec, poll_etl envoie {'status': 'failed'}
+        return {'status': 'pending'}
+
+    df_final = _resolve(data_key)
+    if countries:
+        df_final = df_final[df_final['CountryName'].isin(countries)]
+    df_final = df_final.assign(Year=df_final['Year'].astype(str))[SCATTER_COLUMNS]
+
+    return {
+        'status': 'ready',
+        'rows': len(df_final),
+        'columns': _columnar(df_final),
+        'title': f"Rigueur Politique vs. Taux de Chômage ({df_final['Year'].min()} - {df_final['Year'].max()})",
+        'labels': {
             'Unemployment_Rate': 'Taux de Chômage (ILO/BM, %)',
-            'Stringency_Index': 'Indice de Rigueur OxCGRT'
+            **{col: label for col, (_, label) in oxcgrt.INDICES.items()}
         },
-        template='plotly_white'
-    )
-
-    fig.update_layout(
-        transition_duration=500,
-        xaxis_range=[-5, 105], 
-        yaxis_title='Taux de Chômage (%)',
-        xaxis_title='Indice de Rigueur OxCGRT'
-    )
-    fig.update_traces(marker=dict(size=15, opacity=0.7, line=dict(width=1, color='DarkSlateGrey')))
-    
-    return fig
-
-# 6. EXÉCUTION DE L'APPLICATION
+        'palette': px.colors.qualitative.Plotly,
+        'layout': go.Figure().update_layout(template='plotly_white').to_plotly_json()['layout'],
+    }
+
+
+dash.clientside_callback(
+    """
+    function(x_col, color_col, animation_col, payload) {
+        if (!payload || payload.status === 'pending') {
+            return {data: [], layout: {height: 500, title: {text: "Chargement des données…"}}};
+        }
+        if (payload.status === 'failed') {
+            return {data: [], layout: {height: 500, title: {text:
+                "ERREUR: Le chargement des données a échoué. Voir le message d'erreur ci-dessus."}}};
+        }
+        const cols = payload.columns;
+        const text = (name, i) => cols[name].values[cols[name].codes[i]];
+        const color = cols[color_col.split(':')[0]];
+        const frame = cols[animation_col];
+        const x = cols[x_col];
+
+        // Une trace par groupe de couleur dans chaque image : l'animation garde ses traces
+        const frames = frame.values.map(key => ({
+            name: key,
+            data: color.values.map(() => ({x: [], y: [], customdata: []})),
+        }));
+        for (let i = 0; i < payload.rows; i++) {
+            if (x[i] === null) { continue; }  // mois sans valeur pour cet indice
+            const trace = frames[frame.codes[i]].data[color.codes[i]];
+            trace.x.push(x[i]);
+            trace.y.push(cols.Unemployment_Rate[i]);
+            trace.customdata.push([text('CountryName', i), text('IncomeGroup_Custom', i), text('Year', i)]);
+        }
+        const hover = payload.labels[x_col] + "=%{x}<br>" + payload.labels.Unemployment_Rate + "=%{y}"
+            + "<br>CountryName=%{customdata[0]}<br>IncomeGroup_Custom=%{customdata[1]}"
+            + "<br>Year=%{customdata[2]}<extra></extra>";
+        frames.forEach(f => {
+            f.data = f.data.map((trace, j) => Object.assign({
+                type: "scatter", mode: "markers", name: color.values[j], legendgroup: color.values[j],
+                showlegend: true, hovertemplate: hover,
+                marker: {color: payload.palette[j % payload.palette.length], size: 15, opacity: 0.7,
+                         line: {width: 1, color: "DarkSlateGrey"}},
+            }, trace));
+        });
+
+        const play = {frame: {duration: 500, redraw: false}, mode: "immediate", fromcurrent: true,
+                      transition: {duration: 500, easing: "linear"}};
+        const pause = {frame: {duration: 0, redraw: false}, mode: "immediate", fromcurrent: true,
+                       transition: {duration: 0, easing: "linear"}};
+        const layout = Object.assign({}, payload.layout, {
+            title: {text: payload.title},
+            transition: {duration: 500},
+            xaxis: {range: [-5, 105], title: {text: payload.labels[x_col]}},
+            yaxis: {title: {text: "Taux de Chômage (%)"}},
+            legend: {title: {text: color_col.split(':')[0]}, tracegroupgap: 0},
+            updatemenus: [{
+                type: "buttons", direction: "left", showactive: false,
+                x: 0.1, xanchor: "right", y: 0, yanchor: "top", pad: {r: 10, t: 70},
+                buttons: [{label: "&#9654;", method: "animate", args: [null, play]},
+                          {label: "&#9724;", method: "animate", args: [[null], pause]}],
+            }],
+            sliders: [{
+                active: 0, len: 0.9, x: 0.1, xanchor: "left", y: 0, yanchor: "top", pad: {b: 10, t: 60},
+                currentvalue: {prefix: animation_col + "="},
+                steps: frames.map(f => ({label: f.name, method: "animate",
+                                         args: [[f.name], Object.assign({}, play, {fromcurrent: false})]})),
+            }],
+        });
+        return {data: frames.length ? frames[0].data : [], layout: layout, frames: frames};
+    }
+    """,
+    Output('main-scatter-plot', 'figure'),
+    Input('x-axis-selector', 'value'),
+    Input('color-selector', 'value'),
+    Input('animation-selector', 'value'),
+    Input('scatter-data', 'data'),
+)
+
+# 6. CALLBACK 3 : Tableaux de Corrélation (Filtre sur la Table Précalculée)
+# -------------------------------------------------------------------------------------
+
+LAG_COLUMNS = {f'corr_lag{lag}': f'Corr. (+{lag} mois)' for lag in djamel.LAGS}
+INCOME_COLUMNS = {
+    'IncomeGroup_Custom': 'Groupe de revenu',
+    'Countries': 'Pays',
+    'Stringency_Mean': 'Rigueur moyenne',
+    'Unemployment_Change_Mean': f'Écart chômage vs {djamel.BASELINE_YEAR} (pts)',
+    **LAG_COLUMNS,
+    'slope_lag0': 'Pente (pts / pt de rigueur)',
+}
+COUNTRY_COLUMNS = {
+    'CountryName': 'Pays',
+    'IncomeGroup_Custom': 'Groupe de revenu',
+    'Stringency_Peak': 'Rigueur max.',
+    'Unemployment_Change_Peak': f'Écart chômage max. vs {djamel.BASELINE_YEAR} (pts)',
+    **LAG_COLUMNS,
+    'slope_lag0': 'Pente (pts / pt de rigueur)',
+}
+
+
+def _cell(value):
+    if pd.isna(value):
+        return ''
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), 3)
+    return value
+
+
+def _table(df, columns):
+    header = html.Tr([html.Th(label) for label in columns.values()])
+    rows = [html.Tr([html.Td(_cell(v)) for v in row]) for row in df[list(columns)].itertuples(index=False)]
+    return html.Table([header, *rows], style={'width': '100%', 'marginBottom': '20px'})
+
+
+@dash.callback(
+    Output('correlation-tables', 'children'),
+    Input('stored-data', 'data'),
+    Input('country-selector', 'value')
+)
+def update_correlation_tables(data_key, countries):
+    """Groupes de revenu (tous pays) et pays choisis, lus dans les tables de l'analyse."""
+    if data_key is None:
+        return None
+    by_income = datasets.get('djamel_income_correlation')
+    by_country = datasets.get('djamel_policy_correlation')
+    if countries:
+        by_country = by_country[by_country['CountryName'].isin(countries)]
+    return [
+        html.H3("Rigueur vs. chômage par groupe de revenu (tous les pays)"),
+        _table(by_income, INCOME_COLUMNS),
+        html.H3("Pays sélectionnés"),
+        _table(by_country.sort_values(['IncomeGroup_Custom', 'CountryName']), COUNTRY_COLUMNS),
+    ]
+
+# 7. EXÉCUTION DE L'APPLICATION
 # -------------------------------------------------------------------------------------
@@ -1,7 +1,18 @@
+import os
+import time
+
+_START = time.perf_counter()
+
 from dash import Dash, html
 import dash
 
-app = Dash(__name__, use_pages=True)
+import datasets
+from services import data_watcher, metrics, query_api, static_figures
+
+# Pages register cheaply and load their data on first visit (their `layout`
+# is a function), so startup does no dataset I/O. suppress_callback_exceptions
+# stops Dash from calling every page layout up front to validate callbacks.
+app = Dash(__name__, use_pages=True, pages_folder="Pages", suppress_callback_exceptions=True)
 
 app.layout = html.Div([
     html.H1("Covid-19 Economic Impact Dashboards"),
@@ -22,7 +33,37 @@ app.layout = html.Div([
     dash.page_container  # Renders current page content
 ])
 
-if __name__ == "__main__":
-    app.run(debug=True)
+# Cached, pre-compressed JSON for the static figures of the US and Europe pages
+static_figures.init_app(app.server)
+
+# Read-only JSON / Arrow access to the datasets on /api/datasets
+query_api.init_app(app.server)
 
+# Opt-in callback latency histograms on /metrics (COVID_EDA_METRICS=1)
+if metrics.enabled():
+    metrics.init_app(app)
 
+# --------------------------------------------------
+# Serving process startup
+# --------------------------------------------------
+# Nothing below runs at import: under `python app.py` the background jobs
+# (services/jobs.py, spawned processes) re-import this module as
+# __mp_main__, and must not start a watcher or report a startup of their own.
+STARTUP_BUDGET_SECONDS = float(os.environ.get("COVID_EDA_STARTUP_BUDGET", "3.0"))
+startup_seconds = time.perf_counter() - _START
+
+
+def start_services():
+    """Start the serving process's background services and check the startup
+    time budget. Called once per server process: below for the development
+    server, by wsgi.py for gunicorn workers."""
+    # Edited files in Data/ are reloaded in the background (COVID_EDA_WATCH_SECONDS=0 disables)
+    data_watcher.start()
+    if startup_seconds > STARTUP_BUDGET_SECONDS:
+        print(f"⚠ Startup took {startup_seconds:.2f}s (budget {STARTUP_BUDGET_SECONDS:.2f}s)")
+
+
+if __name__ == "__main__":
+    start_services()
+    print(f"Startup: {startup_seconds:.2f}s (budget {STARTUP_BUDGET_SECONDS:.2f}s)")
+    app.run(debug=True)
@@ -0,0 +1 @@
+# benchmarks: performance harness for the dashboards (see bench_dashboards.py)
@@ -0,0 +1,284 @@
+# bench_dashboards.py: startup, ETL and callback benchmarks against Data/
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_dashboards                   # writes bench_output.json
+#     python -m benchmarks.bench_dashboards --compare old.json
+#
+# Measures, against the real files in Data/:
+#   - cold and warm import of every Pages/* module, each in a fresh process
+#     (cold: empty columnar cache; warm: cache already built), including the
+#     first layout() call since pages load their data on first visit
+#   - the Djamel ETL (build_policy_unemployment), and load_and_store_data with
+#     the background job it submits
+#   - every callback with representative inputs: first call and warm repeats,
+#     plus the size of the JSON payload it returns
+#   - peak RSS of each measuring process
+# Results are written as JSON (with the git commit) so runs can be compared.
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGES = ["global_dashboard", "asia", "US_DashBoard", "Europe_DashBoard", "new_projet"]
+REPEATS = 5
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def payload_bytes(result):
+    import plotly.utils
+    return len(json.dumps(result, cls=plotly.utils.PlotlyJSONEncoder))
+
+
+def _make_app():
+    import dash
+    return dash.Dash(__name__, pages_folder="")
+
+
+# --------------------------------------------------
+# Page import (one fresh process per measurement)
+# --------------------------------------------------
+def _import_page(module):
+    """Runs in a child process: import one page and render its layout once."""
+    start = time.perf_counter()
+    _make_app()
+    page = importlib.import_module(f"Pages.{module}")
+    imported = time.perf_counter()
+    error = None
+    if callable(page.layout):
+        try:
+            page.layout()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    done = time.perf_counter()
+    print(json.dumps({
+        "import_seconds": imported - start,
+        "first_layout_seconds": done - imported,
+        "total_seconds": done - start,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "error": error,
+    }))
+
+
+def bench_page_imports():
+    results = {}
+    for module in PAGES:
+        results[module] = {}
+        # An empty cache of its own for the cold run (the warm run reuses it);
+        # the repository's .cache/ is never touched
+        cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+        env = {**os.environ, "COVID_EDA_CACHE_DIR": cache_dir}
+        try:
+            for mode in ("cold", "warm"):
+                proc = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_dashboards", "--import-page", module],
+                    capture_output=True, text=True, env=env,
+                )
+                if proc.returncode != 0:
+                    results[module][mode] = {"error": proc.stderr.strip().splitlines()[-1:]}
+                else:
+                    results[module][mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+# --------------------------------------------------
+# ETL and callbacks (in this process)
+# --------------------------------------------------
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_etl():
+    from datasets import djamel
+
+    from services import jobs
+
+    seconds, df = _timed(djamel.build_policy_unemployment)
+    page = importlib.import_module("Pages.new_projet")
+    # The callback only submits the background job; time the job separately
+    start = time.perf_counter()
+    first, (job_id, _) = _timed(page.load_and_store_data, None)
+    while jobs.status(job_id)["state"] == "running":
+        time.sleep(0.05)
+    job_seconds = time.perf_counter() - start
+    # The job installed the table in this process: time the analysis engine on it
+    correlation_seconds, correlation = _timed(djamel.build_policy_correlation)
+    warm = [_timed(page.load_and_store_data, None)[0] for _ in range(REPEATS)]
+    return {
+        "build_policy_unemployment_seconds": seconds,
+        "rows": len(df),
+        "build_policy_correlation_seconds": correlation_seconds,
+        "correlation_countries": len(correlation),
+        "load_and_store_data_first_seconds": first,
+        "background_job_seconds": job_seconds,
+        "job_state": jobs.status(job_id)["state"],
+        "load_and_store_data_warm_seconds": statistics.median(warm),
+    }
+
+
+def _callback_cases():
+    """(name, function, args) for every callback, with representative inputs."""
+    from services import wide_series
+
+    europe = importlib.import_module("Pages.Europe_DashBoard")
+    djamel = importlib.import_module("Pages.new_projet")
+    countries = ["France", "India", "United States"]
+    zoom = {"xaxis.range[0]": "2020-01-01", "xaxis.range[1]": "2020-12-31"}
+
+    cases = [
+        # (selection, drawn traces): None is the first render, a full figure
+        ("global.update_gdp", "global_dashboard", "update_gdp", (countries, None)),
+        ("global.update_inflation", "global_dashboard", "update_inflation", (countries, None)),
+        ("global.update_unemployment", "global_dashboard", "update_unemployment", (countries, None)),
+        # One country added to the drawn ones: a Patch appending one trace
+        ("global.update_gdp.add_one", "global_dashboard", "update_gdp",
+         (countries + ["Japan"], [[c, None] for c in countries])),
+        ("global.update_health", "global_dashboard", "update_health", (countries, "daily_new_cases", "daily", None)),
+        ("global.update_health.zoomed", "global_dashboard", "update_health", (countries, "daily_new_cases", "daily", zoom)),
+        ("global.update_health.auto", "global_dashboard", "update_health", (countries, "daily_new_cases", "auto", None)),
+        ("asia.update_gdp_asia", "asia", "update_gdp_asia", (None,)),
+        ("asia.update_inflation_asia", "asia", "update_inflation_asia", (None,)),
+        ("asia.update_unemployment_asia", "asia", "update_unemployment_asia", (None,)),
+        # One payload holds every metric and the radio picks one clientside:
+        # only a granularity change reaches the server
+        ("asia.update_health_data_asia", "asia", "update_health_data_asia", ("daily",)),
+        ("asia.update_health_data_asia.auto", "asia", "update_health_data_asia", ("auto",)),
+        ("us.update_sp500_graph", "US_DashBoard", "update_sp500_graph", (None,)),
+        ("us.update_sp500_graph.zoomed", "US_DashBoard", "update_sp500_graph", (zoom,)),
+        ("us.update_nasdaq_graph", "US_DashBoard", "update_nasdaq_graph", (None,)),
+        ("europe.update_stoxx600_graph", "Europe_DashBoard", "update_stoxx600_graph", (None,)),
+    ]
+    resolved = []
+    for name, module, attr, args in cases:
+        try:
+            page = importlib.import_module(f"Pages.{module}")
+            resolved.append((name, getattr(page, attr), args))
+        except Exception as e:
+            resolved.append((name, None, f"{type(e).__name__}: {e}"))
+
+    for spec in europe.INDICATORS:
+        wide = wide_series.table(spec["dataset"])
+        resolved.append((f"europe.wide_series.{spec['key']}", wide_series.build_figure,
+                         (wide.columns[:3], spec["key"])))
+
+    from datasets import djamel as djamel_etl
+
+    data_key = djamel._stored_key()
+    resolved.append(("djamel.update_scatter_data", djamel.update_scatter_data,
+                     (data_key, djamel_etl.target_countries)))
+    resolved.append(("djamel.update_correlation_tables", djamel.update_correlation_tables,
+                     (data_key, djamel_etl.target_countries)))
+    return resolved
+
+
+def bench_callbacks():
+    from services.figure_cache import figure_cache
+
+    results = {}
+    for name, func, args in _callback_cases():
+        if func is None:
+            results[name] = {"error": args}
+            continue
+        figure_cache.invalidate()
+        try:
+            first, result = _timed(func, *args)
+            warm = [_timed(func, *args)[0] for _ in range(REPEATS)]
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        results[name] = {
+            "first_seconds": first,
+            "warm_seconds": statistics.median(warm),
+            "payload_bytes": payload_bytes(result),
+        }
+    return results
+
+
+# --------------------------------------------------
+# Reporting
+# --------------------------------------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _flatten(tree, prefix=""):
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, path + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(old, new):
+    before = dict(_flatten(old["results"]))
+    print(f"{'metric':70} {'before':>12} {'after':>12} {'change':>8}")
+    for path, value in _flatten(new["results"]):
+        if path in before and before[path]:
+            change = (value - before[path]) / before[path] * 100
+            print(f"{path:70} {before[path]:12.4g} {value:12.4g} {change:+7.1f}%")
+
+
+def run():
+    _make_app()
+    results = {
+        "page_imports": bench_page_imports(),
+        "etl": bench_etl(),
+        "callbacks": bench_callbacks(),
+    }
+    results["peak_rss_bytes"] = peak_rss_bytes()
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--import-page", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.import_page:
+        _import_page(args.import_page)
+        return
+
+    report = run()
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(json.load(fh), report)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.getcwd())
+    main()
@@ -0,0 +1,18 @@
+# datasets: shared, load-once access to the raw files under Data/
+#
+#     import datasets
+#     GDP_df = datasets.get("world_gdp")
+
+from datasets import catalog  # noqa: F401  (registers every source)
+from datasets import djamel  # noqa: F401  (registers the Djamel ETL table)
+from datasets import oxcgrt  # noqa: F401  (registers the OxCGRT policy index table)
+from datasets import worldbank  # noqa: F401  (registers the long World Bank table)
+from datasets.registry import (
+    attach_shared, derive, get, input_stamps, install, load_report, loaded, registered,
+    source_path, subscribe,
+)
+
+__all__ = [
+    "attach_shared", "derive", "get", "input_stamps", "install", "load_report", "loaded",
+    "registered", "source_path", "subscribe",
+]
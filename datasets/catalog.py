@@ -0,0 +1,86 @@
+# catalog.py: every raw source under Data/, keyed by logical name
+
+from datasets import prices, worldometer
+from datasets.registry import register
+
+
+# --------------------------------------------------
+# Shared reader options and schemas (datasets/schema.py)
+# --------------------------------------------------
+# Eurostat exports write ':' for missing values; declaring it as NA lets the
+# CSV parser type country columns as numbers directly
+EUROSTAT = {"na_values": [":"]}
+
+# World Bank API_* files: label columns as categoricals, and only the years
+# the pages plot (global and Asia pages start in 2017)
+WORLD_BANK = {
+    "skiprows": 4,
+    "schema": {
+        "categorical": ["Country Name", "Country Code", "Indicator Name", "Indicator Code"],
+        "years": (2017, None),
+    },
+}
+
+
+# --------------------------------------------------
+# World Bank / worldometer
+# --------------------------------------------------
+register("world_gdp", "World_Data/API_NY.GDP.MKTP.KD.ZG_DS2_en_csv_v2_23243.csv", **WORLD_BANK)
+register("world_inflation", "World_Data/API_FP.CPI.TOTL.ZG_DS2_en_csv_v2_23195.csv", **WORLD_BANK)
+register("world_unemployment", "World_Data/API_SL.UEM.TOTL.ZS_DS2_en_csv_v2_25091.csv", **WORLD_BANK)
+# Streamed in chunks and partitioned by country, see worldometer.py
+register("world_health", "World_Data/worldometer_coronavirus_daily_data.csv", reader=worldometer.load,
+         schema={"categorical": ["country"]}, depends_on=["world_health_population"])
+# Optional: only its country/population columns are used (per-million metrics)
+register("world_health_population", "World_Data/worldometer_coronavirus_summary_data.csv")
+
+# --------------------------------------------------
+# Europe (Eurostat)
+# --------------------------------------------------
+# Price histories: explicit date formats, numeric columns, sorted once (prices.py)
+register("europe_stoxx600", "Europe_Data/STOXX 600 Historical Data (1).csv",
+         prepare=prices.history("Date", "%m/%d/%Y"))
+register("europe_gdp", "Europe_Data/GDP_Dataset.csv", **EUROSTAT)
+register("europe_inflation", "Europe_Data/Inflation_Dataset.csv", **EUROSTAT)
+register("europe_freight", "Europe_Data/Freet_Dataset.csv", **EUROSTAT)
+register("europe_tourism", "Europe_Data/Tourism_Dataset.csv", **EUROSTAT)
+register("europe_debts", "Europe_Data/Debts_Dataset.csv", **EUROSTAT)
+register("europe_unemployment", "Europe_Data/Unemployment_Dataset.csv", **EUROSTAT)
+register("europe_poverty", "Europe_Data/Poverty_Dataset.csv", **EUROSTAT)
+register("europe_aids", "Europe_Data/Aids_Dataset.xlsx", sheet_name="Sheet1")
+# Eurostat tables are wide: a time column, then one column per country
+WIDE_BY_COUNTRY = [
+    "europe_gdp", "europe_inflation", "europe_freight", "europe_tourism",
+    "europe_debts", "europe_unemployment", "europe_poverty",
+]
+
+# --------------------------------------------------
+# US
+# --------------------------------------------------
+register("us_sp500", "US_Data/SP500.csv", prepare=prices.history("Time", "%Y-%m-%d"))
+register("us_nasdaq100", "US_Data/NASDAQ100.csv", prepare=prices.history("Time", "%Y-%m-%d"))
+register("us_gdp", "US_Data/GDP.csv")
+register("us_inflation", "US_Data/Inflation_Dataset.csv")
+register("us_unemployment", "US_Data/Unemployement_Dataset.csv")
+register("us_debts", "US_Data/Debts.csv")
+
+# --------------------------------------------------
+# Djamel (OxCGRT + ILOSTAT)
+# --------------------------------------------------
+# OxCGRT indices, aligned into one (country, date) table by oxcgrt.py
+register("oxcgrt_stringency", "Djamel_Data/stringency_index_avg.xlsx", sheet_name="Sheet1")
+register("oxcgrt_government_response", "Djamel_Data/government_response_index_avg.xlsx", sheet_name="Sheet1")
+# Same World Bank layout; the Djamel ETL reads 2019 (pre-pandemic baseline)
+# to 2023 (djamel.BASELINE_YEAR, START_YEAR, END_YEAR) and joins on Country Code
+register("djamel_unemployment", "Djamel_Data/unemployment_data.csv", skiprows=4, encoding="latin-1",
+         schema={"categorical": ["Country Name", "Indicator Name", "Indicator Code"],
+                 "years": (2019, 2023)})
+# World Bank income classification (FY2025, July 2024) by ISO3 code, same
+# IncomeGroup vocabulary as the metadata file below (djamel.py); its "#"
+# header records the source and vintage
+register("world_income_groups", "World_Data/income_groups.csv", comment="#",
+         schema={"categorical": ["IncomeGroup"]})
+# Optional: the Metadata_Country_* file shipped with World Bank downloads;
+# when present, its (newer) IncomeGroup column takes precedence
+register("world_country_meta", "World_Data/Metadata_Country_API_SL.UEM.TOTL.ZS_DS2_en_csv_v2_25091.csv",
+         encoding="utf-8-sig", schema={"categorical": ["Region", "IncomeGroup"]})
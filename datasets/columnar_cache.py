@@ -0,0 +1,100 @@
+# columnar_cache.py: build-or-reuse Parquet copies of the raw files in Data/
+#
+# The first read of a CSV/XLSX parses it as usual and writes a typed Parquet
+# copy under CACHE_DIR. Later reads (including other worker processes and
+# later runs) load the Parquet file instead. The cache key covers the source
+# path, its mtime and size, and the reader options, so replacing a raw file
+# makes its old cache entry unreachable; stale entries are removed on rebuild.
+#
+# pyarrow is optional: without it, files are simply parsed every time.
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CACHE_DIR = os.environ.get("COVID_EDA_CACHE_DIR", os.path.join(".cache", "columnar"))
+
+
+def cache_key(path, read_kwargs):
+    st = os.stat(path)
+    raw = repr((os.path.abspath(path), st.st_mtime_ns, st.st_size, sorted(read_kwargs.items())))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _stem(path):
+    # Parent folder is part of the stem: Europe_Data and US_Data both ship Inflation_Dataset.csv
+    folder = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    name = os.path.basename(path).rsplit(".", 1)[0]
+    return f"{folder}__{name}".replace(" ", "_")
+
+
+def cache_path(path, read_kwargs):
+    return os.path.join(CACHE_DIR, f"{_stem(path)}-{cache_key(path, read_kwargs)}.parquet")
+
+
+def _remove_stale(path, keep):
+    prefix = _stem(path) + "-"
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for entry in os.listdir(CACHE_DIR):
+        full = os.path.join(CACHE_DIR, entry)
+        if entry.startswith(prefix) and entry.endswith(".parquet") and full != keep:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def _write(df, target):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, target)  # atomic: concurrent workers never see a partial file
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def read(path, parse, read_kwargs):
+    """Return the frame for `path`, served from the Parquet cache when fresh.
+
+    `parse(path, read_kwargs)` is the slow text/XLSX reader used on a miss."""
+    if not HAS_PYARROW:
+        return parse(path, read_kwargs)
+
+    target = cache_path(path, read_kwargs)
+    if os.path.exists(target):
+        try:
+            return pd.read_parquet(target)
+        except Exception as e:
+            print(f"Columnar cache unreadable, rebuilding {target}: {e}")
+
+    df = parse(path, read_kwargs)
+    try:
+        _write(df, target)
+        _remove_stale(path, keep=target)
+    except Exception as e:
+        # Mixed-type object columns can't always be written; serve the parsed frame
+        print(f"Columnar cache skipped for {path}: {e}")
+    return df
+
+
+def clear():
+    if os.path.isdir(CACHE_DIR):
+        for entry in os.listdir(CACHE_DIR):
+            full = os.path.join(CACHE_DIR, entry)
+            if os.path.isdir(full):
+                shutil.rmtree(full)  # partitioned datasets (worldometer.py)
+            else:
+                os.remove(full)
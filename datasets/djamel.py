@@ -0,0 +1,207 @@
+# djamel.py: ETL du tableau de bord de Djamel (OxCGRT x ILOSTAT)
+#
+# Le pipeline (indices OxCGRT par pays et par jour, agrégation mensuelle,
+# fusion avec le chômage) tournait à chaque visite de la page. Il est
+# désormais déclaré comme table dérivée du registre : exécuté une seule fois
+# par processus, au premier accès, puis mémorisé.
+#
+# Il couvre tous les pays (jointure sur le code ISO3, commun aux deux
+# sources) ; la page filtre ensuite la table selon les pays choisis. Le moteur
+# d'analyse (build_policy_correlation) en dérive, pour tous les pays d'un
+# coup, les corrélations et pentes entre la rigueur du mois M et le chômage
+# de l'année du mois M + décalage, et
+# l'écart au chômage d'avant la pandémie, par pays et par groupe de revenu.
+# Les deux tables sont recalculées seulement quand un fichier source change
+# (registry.refresh).
+
+import numpy as np
+import pandas as pd
+
+from datasets import oxcgrt, registry
+
+START_YEAR = 2020
+END_YEAR = 2023
+BASELINE_YEAR = 2019  # chômage de référence, avant la pandémie
+LAGS = (0, 6, 12)  # décalage (en mois) entre la rigueur et le chômage
+MIN_POINTS = 12  # mois minimum pour une corrélation par pays
+
+# Groupes de revenu de la Banque mondiale : classement livré avec le projet
+# (income_groups.csv), remplacé par le fichier Metadata_Country_* s'il est présent
+INCOME_GROUPS = 'world_income_groups'
+COUNTRY_META = 'world_country_meta'
+# Libellés de la page ; les revenus intermédiaires inférieurs s'ajoutent au groupe 2
+INCOME_BUCKETS = {
+    'High income': '1 - Haut Revenu',
+    'Upper middle income': '2 - Émergent (Interm. Sup.)',
+    'Lower middle income': '2 - Émergent (Interm. Inf.)',
+    'Low income': '3 - Faible Revenu',
+}
+UNCLASSIFIED = '4 - Non classé'
+
+# --- SÉLECTION PAR DÉFAUT DES 9 PAYS ---
+# (et leur groupe de revenu si aucun classement n'est lisible)
+TARGET_COUNTRIES_LIST = [
+    {'CountryName': 'France', 'CountryCode': 'FRA', 'IncomeGroup_Custom': '1 - Haut Revenu'},
+    {'CountryName': 'United Kingdom', 'CountryCode': 'GBR', 'IncomeGroup_Custom': '1 - Haut Revenu'},
+    {'CountryName': 'Japan', 'CountryCode': 'JPN', 'IncomeGroup_Custom': '1 - Haut Revenu'},
+    {'CountryName': 'Brazil', 'CountryCode': 'BRA', 'IncomeGroup_Custom': '2 - Émergent (Interm. Sup.)'},
+    {'CountryName': 'China', 'CountryCode': 'CHN', 'IncomeGroup_Custom': '2 - Émergent (Interm. Sup.)'},
+    {'CountryName': 'South Africa', 'CountryCode': 'ZAF', 'IncomeGroup_Custom': '2 - Émergent (Interm. Sup.)'},
+    {'CountryName': 'Ethiopia', 'CountryCode': 'ETH', 'IncomeGroup_Custom': '3 - Faible Revenu'},
+    {'CountryName': 'Sudan', 'CountryCode': 'SDN', 'IncomeGroup_Custom': '3 - Faible Revenu'},
+    {'CountryName': 'Yemen', 'CountryCode': 'YEM', 'IncomeGroup_Custom': '3 - Faible Revenu'},
+]
+df_target = pd.DataFrame(TARGET_COUNTRIES_LIST)
+target_countries = df_target['CountryName'].tolist()
+
+
+def _income_groups():
+    """Groupe de revenu par code pays (Country Code -> libellé de la page)."""
+    groups = df_target.set_index('CountryCode')['IncomeGroup_Custom']
+    for source in (INCOME_GROUPS, COUNTRY_META):  # le dernier lu l'emporte
+        try:
+            table = registry.get(source)
+        except (OSError, KeyError) as e:
+            if source == INCOME_GROUPS:
+                print(f"Classement des revenus illisible : {e}")
+            continue
+        labels = table.set_index('Country Code')['IncomeGroup'].astype(str).map(INCOME_BUCKETS)
+        groups = labels.dropna().combine_first(groups)
+    return groups
+
+
+def _no_progress(fraction, message=""):
+    pass
+
+
+def build_policy_unemployment(progress=_no_progress):
+    """Indices OxCGRT mensuels (oxcgrt.INDICES) fusionnés avec le taux de chômage annuel.
+
+    `progress(fraction, message)` suit l'avancement quand le calcul tourne en
+    tâche de fond (services/jobs.py)."""
+    # --- 1. Indices de politique OxCGRT (table pays x jour, datasets/oxcgrt.py) ---
+    progress(0.05, "Lecture des indices OxCGRT")
+    df_policy = registry.get(oxcgrt.DATASET).reset_index()
+    progress(0.6, "Agrégation mensuelle")
+
+    df_policy['Year'] = df_policy['Date'].dt.year
+    df_policy['Year_Month'] = df_policy['Date'].dt.to_period('M').astype(str)
+    df_policy['CountryName'] = df_policy['CountryName'].astype(str)
+
+    df_policy_monthly = df_policy.groupby(
+        ['CountryCode', 'CountryName', 'Year_Month', 'Year']
+    )[list(oxcgrt.INDICES)].mean().reset_index()
+
+    # --- 2. Chargement des Données de Chômage (ILOSTAT) ---
+    progress(0.8, "Lecture du chômage (ILOSTAT)")
+    df_unemployment_raw = registry.get('djamel_unemployment')
+    baseline = df_unemployment_raw.set_index('Country Code')[str(BASELINE_YEAR)]
+
+    df_unemployment = df_unemployment_raw.melt(
+        id_vars=['Country Code'],
+        value_vars=[str(y) for y in range(START_YEAR, END_YEAR + 1)],
+        var_name='Year',
+        value_name='Unemployment_Rate'
+    ).dropna(subset=['Unemployment_Rate'])
+
+    df_unemployment['Year'] = df_unemployment['Year'].astype(int)
+    df_unemployment = df_unemployment.rename(columns={'Country Code': 'CountryCode'})
+    df_unemployment['CountryCode'] = df_unemployment['CountryCode'].astype(str)
+    df_unemployment['Unemployment_Baseline'] = df_unemployment['CountryCode'].map(baseline)
+    df_unemployment['Unemployment_Change'] = (
+        df_unemployment['Unemployment_Rate'] - df_unemployment['Unemployment_Baseline']
+    )
+
+    # --- 3. Fusion Finale ---
+    progress(0.9, "Fusion")
+    df_final = pd.merge(df_policy_monthly, df_unemployment, on=['CountryCode', 'Year'], how='left')
+    df_final = df_final.dropna(subset=['Unemployment_Rate'])
+    df_final = df_final.dropna(subset=list(oxcgrt.INDICES), how='all')
+    df_final['IncomeGroup_Custom'] = df_final['CountryCode'].map(_income_groups()).fillna(UNCLASSIFIED)
+
+    if df_final.empty:
+        raise ValueError("Le DataFrame final est vide après le filtrage. Vérifiez la correspondance des codes pays.")
+
+    print(f"Fusion terminée. Nombre d'observations : {len(df_final)}. Prêt pour l'affichage.")
+    return df_final
+
+
+# --------------------------------------------------
+# Moteur d'analyse : rigueur vs chômage, tous pays
+# --------------------------------------------------
+def _lagged_pairs(df, lag):
+    """Rigueur du mois M face au chômage (annuel) de l'année du mois M + lag."""
+    month = df['Year_Month'].str[5:7].astype(int)
+    target_year = df['Year'] + (month - 1 + lag) // 12
+    rates = df.drop_duplicates(['CountryCode', 'Year'])[['CountryCode', 'Year', 'Unemployment_Rate']]
+    pairs = df[['CountryCode', 'IncomeGroup_Custom', 'Stringency_Index']].assign(Year=target_year)
+    pairs = pairs.merge(rates, on=['CountryCode', 'Year']).dropna(subset=['Stringency_Index'])
+    return pairs.rename(columns={'Stringency_Index': 'x', 'Unemployment_Rate': 'y'})
+
+
+def _fit(pairs, by):
+    """Corrélation et pente (chômage ~ rigueur) de chaque groupe, par sommes groupées."""
+    sums = pairs.assign(xx=pairs['x'] ** 2, yy=pairs['y'] ** 2, xy=pairs['x'] * pairs['y'])
+    sums = sums.groupby(by, observed=True)[['x', 'y', 'xx', 'yy', 'xy']].sum()
+    n = pairs.groupby(by, observed=True).size()
+    sxx = sums['xx'] - sums['x'] ** 2 / n
+    syy = sums['yy'] - sums['y'] ** 2 / n
+    sxy = sums['xy'] - sums['x'] * sums['y'] / n
+    # Rigueur constante (ou trop peu de points) : pas de pente définie
+    sxx = sxx.where(sxx > 1e-9)
+    return pd.DataFrame({
+        'n': n,
+        'corr': sxy / np.sqrt(sxx * syy.where(syy > 1e-9)),
+        'slope': sxy / sxx,
+    })
+
+
+def _engine(df, by):
+    parts = []
+    for lag in LAGS:
+        fit = _fit(_lagged_pairs(df, lag), by)
+        parts.append(fit.add_suffix(f'_lag{lag}'))
+    fits = pd.concat(parts, axis=1)
+    counts = [f'n_lag{lag}' for lag in LAGS]
+    fits[counts] = fits[counts].fillna(0).astype(int)
+    return fits
+
+
+def build_policy_correlation():
+    """Par pays : corrélation et pente rigueur -> chômage (décalages LAGS),
+    rigueur moyenne et maximale, écart maximal au chômage de BASELINE_YEAR."""
+    df = registry.get('djamel_policy_unemployment')
+    summary = df.groupby('CountryCode', observed=True).agg(
+        CountryName=('CountryName', 'first'),
+        IncomeGroup_Custom=('IncomeGroup_Custom', 'first'),
+        Stringency_Mean=('Stringency_Index', 'mean'),
+        Stringency_Peak=('Stringency_Index', 'max'),
+        Unemployment_Change_Peak=('Unemployment_Change', 'max'),
+    )
+    fits = _engine(df, 'CountryCode')
+    for lag in LAGS:
+        few = fits[f'n_lag{lag}'] < MIN_POINTS
+        fits.loc[few, [f'corr_lag{lag}', f'slope_lag{lag}']] = np.nan
+    return summary.join(fits).reset_index()
+
+
+def build_income_correlation():
+    """Par groupe de revenu : mêmes indicateurs, tous les pays du groupe réunis."""
+    df = registry.get('djamel_policy_unemployment')
+    summary = df.groupby('IncomeGroup_Custom', observed=True).agg(
+        Countries=('CountryCode', 'nunique'),
+        Stringency_Mean=('Stringency_Index', 'mean'),
+        Unemployment_Change_Mean=('Unemployment_Change', 'mean'),
+    )
+    return summary.join(_engine(df, 'IncomeGroup_Custom')).reset_index()
+
+
+registry.derive(
+    'djamel_policy_unemployment',
+    build_policy_unemployment,
+    depends_on=[oxcgrt.DATASET, 'djamel_unemployment', INCOME_GROUPS, COUNTRY_META],
+)
+registry.derive('djamel_policy_correlation', build_policy_correlation,
+                depends_on=['djamel_policy_unemployment'])
+registry.derive('djamel_income_correlation', build_income_correlation,
+                depends_on=['djamel_policy_unemployment'])
@@ -0,0 +1,74 @@
+# oxcgrt.py: the OxCGRT policy indices as one (country, date) table
+#
+# OxCGRT ships one workbook per index, each wide: a row per jurisdiction and
+# a column per day ("01Jan2020", ...). Each workbook is parsed once (and kept
+# as Parquet by columnar_cache), reduced to its national rows, and the
+# indices are aligned on the same country x day grid into a single table
+#     index (CountryCode, Date), columns CountryName + one float32 per index
+# so a page switching from one index to another reads another column of
+# this table instead of parsing a second workbook.
+#
+# Only the NAT_TOTAL row of each country is kept. The original Djamel ETL
+# averaged every row of a country, so for the countries that also report
+# STATE_TOTAL rows (Australia, Canada, the United Kingdom and the United
+# States in the shipped workbooks) its monthly index mixed the national
+# value with the sub-national ones, weighted by the number of states. The
+# national row is the country's own index; monthly values for those four
+# countries differ from the original ETL's, all others are unchanged.
+
+import numpy as np
+import pandas as pd
+
+from datasets import registry
+
+DATASET = "oxcgrt_policy_indices"
+DATE_FORMAT = "%d%b%Y"
+ID_COLUMNS = ["country_code", "country_name", "region_code", "region_name", "jurisdiction"]
+
+# column -> (source dataset, label)
+INDICES = {
+    "Stringency_Index": ("oxcgrt_stringency", "Indice de Rigueur (OxCGRT)"),
+    "Government_Response_Index": ("oxcgrt_government_response", "Indice de Réponse Gouvernementale (OxCGRT)"),
+}
+
+
+def _national(source):
+    """National rows of one workbook: (codes, names, dates, values[country, day])."""
+    wide = registry.get(source)
+    # STATE_TOTAL rows (states, provinces) are not the country's own index
+    wide = wide[wide["jurisdiction"] == "NAT_TOTAL"]
+    day_columns = [col for col in wide.columns if col not in ID_COLUMNS]
+    dates = pd.to_datetime(pd.Index(day_columns), format=DATE_FORMAT, errors="coerce")
+    keep = ~dates.isna()
+    values = wide[day_columns].to_numpy(dtype="float32")[:, keep]
+    codes = pd.Index(wide["country_code"].astype(str))
+    names = pd.Series(wide["country_name"].astype(str).to_numpy(), index=codes)
+    return codes, names, dates[keep], values
+
+
+def build_policy_indices():
+    parts = {column: _national(source) for column, (source, _) in INDICES.items()}
+    codes = sorted(set().union(*(codes for codes, _, _, _ in parts.values())))
+    dates = sorted(set().union(*(dates for _, _, dates, _ in parts.values())))
+    codes, dates = pd.Index(codes), pd.DatetimeIndex(dates)
+
+    columns = {}
+    names = pd.Series(dtype=object)
+    for column, (part_codes, part_names, part_dates, values) in parts.items():
+        # Scatter each workbook into the shared grid, then flatten row by row
+        grid = np.full((len(codes), len(dates)), np.nan, dtype="float32")
+        grid[np.ix_(codes.get_indexer(part_codes), dates.get_indexer(part_dates))] = values
+        columns[column] = grid.ravel()
+        names = names.combine_first(part_names)
+
+    index = pd.MultiIndex.from_product([codes, dates], names=["CountryCode", "Date"])
+    df = pd.DataFrame(columns, index=index)
+    df.insert(0, "CountryName", pd.Categorical(np.repeat(names.reindex(codes).to_numpy(), len(dates))))
+    return df.dropna(subset=list(INDICES), how="all")
+
+
+registry.derive(
+    DATASET,
+    build_policy_indices,
+    depends_on=[source for source, _ in INDICES.values()],
+)
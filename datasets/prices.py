@@ -0,0 +1,44 @@
+# prices.py: daily price histories (STOXX 600, S&P 500, NASDAQ 100)
+#
+# The files come from two exporters:
+#   - investing.com (STOXX 600): dates as MM/DD/YYYY, newest first, quoted
+#     prices that may carry thousands separators, volume as "237.23M" and
+#     the daily change as "0.45%"
+#   - the US series: ISO dates under "Time" and a plain "Price" column
+# history() returns the registry `prepare` step for such a file: dates parsed
+# with the file's explicit format (no per-element format inference), every
+# other column converted to float in one vectorized pass, and rows sorted by
+# date once, oldest first. The pages then plot the frame as is.
+
+import functools
+
+import pandas as pd
+
+# Suffixes of the exported numbers; "%" keeps the value in percent points
+_SCALE = {"": 1.0, "%": 1.0, "K": 1e3, "M": 1e6, "B": 1e9}
+_NUMBER = r"^([-+]?\d*\.?\d+)([KMB%]?)$"
+
+
+def to_number(values):
+    """'1,234.5', '237.23M', '-0.17%' -> float; blanks and junk -> NaN."""
+    if values.dtype.kind in "iuf":
+        return values.astype("float64")
+    text = values.astype("string").str.strip().str.replace(",", "", regex=False)
+    parts = text.str.extract(_NUMBER)
+    return pd.to_numeric(parts[0], errors="coerce") * parts[1].map(_SCALE).astype("float64")
+
+
+def _prepare(df, date_column, date_format):
+    dates = pd.to_datetime(df[date_column], format=date_format, errors="coerce")
+    columns = {date_column: dates}
+    for col in df.columns:
+        if col != date_column:
+            columns[col] = to_number(df[col])
+    prices = pd.DataFrame(columns, index=df.index)
+    prices = prices[dates.notna()].sort_values(date_column, kind="stable")
+    return prices.reset_index(drop=True)
+
+
+def history(date_column, date_format):
+    """Registry `prepare` step for a price history with dates in `date_format`."""
+    return functools.partial(_prepare, date_column=date_column, date_format=date_format)
@@ -0,0 +1,324 @@
+# registry.py: load-once dataset registry shared by every page
+#
+# Each raw file under Data/ is declared once with a logical name. The first
+# call to get() parses it (through columnar_cache.py); later calls, from any
+# page in the same process, reuse the parsed frame. Derived tables (ETL
+# results) are declared with derive() and memoized the same way. Load time
+# and memory footprint are recorded per dataset, see load_report().
+#
+# refresh() reloads datasets whose file changed (see stale_sources()), plus
+# every loaded table derived from them, and swaps them in together. Until
+# the swap, other threads keep getting the previous frames. Caches built on
+# top of the registry subscribe() to learn which datasets were replaced.
+
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from datasets import columnar_cache, schema, shared
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = "Data"
+
+# --------------------------------------------------
+# Internal state
+# --------------------------------------------------
+_SOURCES = {}   # name -> source spec (path, reader kwargs, prepare) or derived spec
+_FRAMES = {}    # name -> parsed DataFrame
+_STATS = {}     # name -> {"seconds", "loaded_bytes", "bytes", "rows", "source"}
+_STAMPS = {}    # name -> (mtime_ns, size) of its file when it was loaded
+_LISTENERS = []
+_LOCK = threading.RLock()
+_REFRESH_LOCK = threading.Lock()
+_local = threading.local()  # .pending / .stamps: frames and stamps being swapped in by refresh()
+
+
+def register(name, path, prepare=None, reader=None, schema=None, depends_on=(), **read_kwargs):
+    """Declare a dataset. `path` is relative to DATA_DIR; `read_kwargs` go to
+    pd.read_csv / pd.read_excel and `prepare(df)` may clean the parsed frame.
+    A custom `reader(path)` replaces both the parser and the columnar cache;
+    `depends_on` lists other datasets it reads. `schema` holds options for
+    schema.compact(), applied to every loaded frame."""
+    _SOURCES[name] = {
+        "path": os.path.join(DATA_DIR, path),
+        "prepare": prepare,
+        "reader": reader,
+        "schema": schema or {},
+        "depends_on": tuple(depends_on),
+        "read_kwargs": read_kwargs,
+    }
+
+
+def derive(name, build, depends_on=()):
+    """Declare a table computed from other datasets. `build()` runs once per
+    process, on the first get(name), and again on refresh() of any input;
+    `depends_on` lists the inputs it reads."""
+    _SOURCES[name] = {
+        "build": build,
+        "depends_on": tuple(depends_on),
+    }
+
+
+def source_path(name):
+    return _SOURCES[name]["path"]
+
+
+def registered():
+    return list(_SOURCES)
+
+
+def _read(path, read_kwargs):
+    if path.endswith((".xlsx", ".xls")):
+        return pd.read_excel(path, **read_kwargs)
+    return pd.read_csv(path, **read_kwargs)
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _files(name):
+    """Paths of the raw files `name` is read or built from."""
+    spec = _SOURCES[name]
+    paths = {spec["path"]} if "path" in spec else set()
+    for dep in spec["depends_on"]:
+        paths |= _files(dep)
+    return paths
+
+
+def input_stamps(name):
+    """Current stamps of the raw files `name` is read or built from."""
+    return {dep: _stamp(_SOURCES[dep]["path"]) for dep in _inputs(name) if "path" in _SOURCES[dep]}
+
+
+def _track(stamps):
+    # Inputs of a table obtained without reading them here (snapshot, job):
+    # stale_sources() must still see their files change
+    for dep, st in stamps.items():
+        _STAMPS.setdefault(dep, st)
+
+
+def _load(name, use_shared=True, build=True):
+    spec = _SOURCES[name]
+    start = time.perf_counter()
+    loaded_bytes = None
+    # Snapshot exported by the master process of a multi-worker deployment,
+    # unless one of its files changed after the snapshot was taken
+    folder = shared.shared_dir() if use_shared else None
+    df = None
+    if folder and shared.HAS_PYARROW:
+        stamps = [_stamp(path) for path in _files(name)]
+        newest = max((st[0] for st in stamps if st is not None), default=0)
+        df = shared.attach(name, folder, not_before_ns=newest)
+    if df is not None:
+        _track(input_stamps(name))
+        source = "shared"
+    elif not build:
+        return None
+    elif "build" in spec:
+        df = spec["build"]()
+        source = "derived"
+    else:
+        if spec["reader"] is not None:
+            df = spec["reader"](spec["path"])
+        else:
+            df = columnar_cache.read(spec["path"], _read, spec["read_kwargs"])
+            if spec["prepare"] is not None:
+                df = spec["prepare"](df)
+        loaded_bytes = schema.memory(df)
+        df = schema.compact(df, **spec["schema"])
+        source = "file"
+    nbytes = schema.memory(df)
+    if loaded_bytes is not None:
+        log.info("Loaded %s: %.2f MB -> %.2f MB", name, loaded_bytes / 1e6, nbytes / 1e6)
+    _STATS[name] = {
+        "seconds": time.perf_counter() - start,
+        "loaded_bytes": loaded_bytes if loaded_bytes is not None else nbytes,
+        "bytes": nbytes,
+        "rows": len(df),
+        "source": source,
+    }
+    return df
+
+
+def get(name):
+    """Return the dataset registered under `name`, parsing it on first use.
+
+    The result is a shallow copy: adding, renaming or replacing columns does
+    not leak into other pages, but the underlying values are shared and must
+    be treated as read-only."""
+    pending = getattr(_local, "pending", None)
+    if pending is not None and name in pending:
+        return pending[name].copy(deep=False)
+    if name not in _FRAMES:
+        with _LOCK:
+            if name not in _FRAMES:
+                if "path" in _SOURCES[name]:
+                    # Taken before reading (and kept if the file is missing), so a
+                    # write during the read or a file appearing later shows up as stale
+                    _STAMPS[name] = _stamp(_SOURCES[name]["path"])
+                _FRAMES[name] = _load(name)
+    return _FRAMES[name].copy(deep=False)
+
+
+def loaded(name):
+    return name in _FRAMES
+
+
+def info(name):
+    """What is known about `name` without loading it: its source file or
+    inputs, and the rows and bytes of the frame if this process holds one."""
+    spec = _SOURCES[name]
+    stats = _STATS.get(name, {}) if name in _FRAMES else {}
+    return {
+        "kind": "derived" if "build" in spec else "file",
+        "path": spec.get("path"),
+        "depends_on": list(spec["depends_on"]),
+        "loaded": name in _FRAMES,
+        "rows": stats.get("rows"),
+        "bytes": stats.get("bytes"),
+    }
+
+
+def stamp(name, served=False):
+    """(mtime_ns, size) of the file of `name` as the served data was read.
+
+    Readers serving a file piece by piece (worldometer partitions) key on
+    this instead of the live file: an edit is only picked up by refresh().
+    The first call records the current stamp, as get() does. Inside a
+    refresh() the builders get the new stamp, unless `served` is set."""
+    pending = getattr(_local, "stamps", None)
+    if not served and pending is not None and name in pending:
+        return pending[name]
+    with _LOCK:
+        if name not in _STAMPS:
+            _STAMPS[name] = _stamp(_SOURCES[name]["path"])
+        return _STAMPS[name]
+
+
+def attach_shared(name):
+    """Load `name` from the shared snapshot if it holds a current one,
+    without ever building it; True if `name` is loaded in this process."""
+    if name in _FRAMES:
+        return True
+    with _LOCK:
+        if name not in _FRAMES:
+            df = _load(name, build=False)
+            if df is None:
+                return False
+            _FRAMES[name] = df
+    return True
+
+
+def install(name, df, stamps=None):
+    """Hand the registry a derived table computed elsewhere (for example by
+    a background job, services/jobs.py) so get() does not rebuild it.
+
+    `stamps` are the input_stamps(name) taken before the computation read
+    its inputs (default: the current ones); they are recorded so that an
+    edit of any input makes refresh() rebuild the table."""
+    stamps = stamps if stamps is not None else input_stamps(name)
+    with _LOCK:
+        if name not in _FRAMES:
+            _FRAMES[name] = df
+            _track(stamps)
+
+
+def version(name):
+    """Short hash of the file stamps the current get(name) was built from.
+
+    It changes when refresh() swaps in new data, and processes serving the
+    same files agree on it, so it can stand in for an ETag."""
+    stamps = sorted(
+        (dep, _STAMPS.get(dep) or _stamp(_SOURCES[dep]["path"]))
+        for dep in _inputs(name) if "path" in _SOURCES[dep]
+    )
+    return hashlib.sha1(repr(stamps).encode("utf-8")).hexdigest()[:16]
+
+
+def _inputs(name):
+    """`name` and every dataset it is built from, directly or not."""
+    found = {name}
+    for dep in _SOURCES[name]["depends_on"]:
+        found |= _inputs(dep)
+    return found
+
+
+# --------------------------------------------------
+# Refresh
+# --------------------------------------------------
+def subscribe(listener):
+    """Call `listener(names)` after refresh() replaced the datasets `names`."""
+    _LISTENERS.append(listener)
+
+
+def stale_sources():
+    """Loaded raw datasets whose file changed since it was read."""
+    return [
+        name for name, stamp in list(_STAMPS.items())
+        if _stamp(_SOURCES[name]["path"]) != stamp
+    ]
+
+
+def dependents(names):
+    """`names` and every dataset built from them, directly or not, in build order."""
+    order = []
+
+    def visit(name):
+        if name not in order:
+            for dep in _SOURCES[name]["depends_on"]:
+                visit(dep)
+            order.append(name)
+
+    for name in _SOURCES:
+        visit(name)
+    affected = set(names)
+    for name in order:  # inputs come first, so one pass reaches every dependent
+        if affected & set(_SOURCES[name]["depends_on"]):
+            affected.add(name)
+    return [name for name in order if name in affected]
+
+
+def refresh(names):
+    """Rebuild the loaded datasets among `names` and their dependents, then
+    swap them all in at once. Returns the names notified to subscribers.
+
+    Requests keep being served from the previous frames while the rebuild
+    runs; if any rebuild fails, nothing is swapped."""
+    with _REFRESH_LOCK:
+        affected = dependents(names)
+        stamps = {name: _stamp(_SOURCES[name]["path"]) for name in affected if name in _STAMPS}
+        pending = {}
+        _local.pending = pending  # builders in this thread see the new inputs
+        _local.stamps = stamps
+        try:
+            for name in affected:
+                if name in _FRAMES:
+                    pending[name] = _load(name, use_shared=False)
+        finally:
+            _local.pending = None
+            _local.stamps = None
+        with _LOCK:
+            _FRAMES.update(pending)
+            _STAMPS.update(stamps)
+    for listener in _LISTENERS:
+        listener(set(affected))
+    return affected
+
+
+def load_report():
+    """Per-dataset load time and memory footprint, in load order.
+
+    `loaded_bytes` is the footprint with pandas' default dtypes, `bytes` the
+    footprint after schema.compact()."""
+    rows = [{"dataset": name, **stats} for name, stats in _STATS.items()]
+    return pd.DataFrame(rows, columns=["dataset", "seconds", "loaded_bytes", "bytes", "rows", "source"])
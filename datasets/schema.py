@@ -0,0 +1,89 @@
+# schema.py: compact dtypes for the frames held by the registry
+#
+# Raw files load with pandas' defaults: float64 everywhere, int64 counts and
+# object strings. compact() shrinks a frame in place of those defaults:
+#   - listed label columns (country, indicator, ...) become categoricals
+#   - float columns become float32 when every value survives the round trip
+#     at the column's own precision (see _fits_float32); big exact counts
+#     and long decimals stay float64
+#   - integer columns take the smallest integer type holding their range
+#   - year columns ("1960", "1961", ...) outside `years` are dropped, and so
+#     are the empty "Unnamed: N" columns left by trailing commas
+#
+# Every raw dataset goes through compact() after loading (registry._load),
+# with per-dataset options from the catalog.
+
+import numpy as np
+import pandas as pd
+
+MAX_DECIMALS = 4
+
+
+def _decimals(values):
+    """Fewest decimals (up to MAX_DECIMALS) that write every value exactly."""
+    for d in range(MAX_DECIMALS + 1):
+        if np.array_equal(np.round(values, d), values):
+            return d
+    return None
+
+
+def _fits_float32(values):
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return True
+    narrowed = values.astype("float32").astype("float64")
+    d = _decimals(values)
+    if d is None:
+        # Measured data with long decimals: 7 significant digits are plenty
+        return bool(np.allclose(narrowed, values, rtol=1e-6, atol=0))
+    return np.array_equal(np.round(narrowed, d), values)
+
+
+def widen(values):
+    """float64 copy of float32 `values` without the float32 noise (2.7, not
+    2.700000047): each value is written back at the precision it was kept at."""
+    narrow = np.asarray(values, dtype="float32")
+    wide = narrow.astype("float64")
+    finite = np.isfinite(narrow)
+    for d in range(MAX_DECIMALS + 1):
+        rounded = np.round(wide, d)
+        if np.array_equal(rounded[finite].astype("float32"), narrow[finite]):
+            return rounded
+    # Long decimals: the shortest repr of each float32
+    return narrow.astype(str).astype("float64")
+
+
+def _outside(col, years):
+    if not isinstance(col, str) or not col.isdigit():
+        return False
+    first, last = years
+    year = int(col)
+    return (first is not None and year < first) or (last is not None and year > last)
+
+
+def compact(df, categorical=(), years=None):
+    """Return `df` with lean dtypes; `years` is a (first, last) pair, either end None."""
+    drop = [
+        col for col in df.columns
+        if (isinstance(col, str) and col.startswith("Unnamed:") and df[col].isna().all())
+        or (years is not None and _outside(col, years))
+    ]
+    df = df.drop(columns=drop)
+
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col in categorical:
+            columns[col] = values.astype("category")
+        elif values.dtype.kind == "f":
+            if _fits_float32(values.to_numpy()):
+                columns[col] = values.astype("float32")
+        elif values.dtype.kind in "iu":
+            columns[col] = pd.to_numeric(values, downcast="integer")
+    if not columns:
+        return df
+    return pd.DataFrame({col: columns.get(col, df[col]) for col in df.columns}, index=df.index)
+
+
+def memory(df):
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,122 @@
+# shared.py: memory-mapped Arrow snapshots shared by all worker processes
+#
+# In a multi-worker deployment (see gunicorn.conf.py) the master process
+# loads every dataset once and writes it as an uncompressed Arrow IPC file
+# under SHARED_DIR. Workers memory-map those files instead of parsing Data/:
+# numeric columns are handed to pandas as zero-copy views of the mapping, so
+# the OS page cache holds one copy of the numbers however many workers run.
+# Text columns (country names, ...) are small and are copied per worker.
+#
+# Attached values live in read-only memory, in line with the registry's
+# read-only contract: pages add or replace columns, they never write in place.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SHARED_DIR_ENV = "COVID_EDA_SHARED_DIR"
+INDEX_KEY = b"covid_eda_index"
+MAPPING_ATTR = "shared_mapping"  # df.attrs entry: (address, size) of the mapped file
+
+
+def shared_dir():
+    return os.environ.get(SHARED_DIR_ENV) or None
+
+
+def _path(folder, name):
+    return os.path.join(folder, f"{name}.arrow")
+
+
+def _to_arrow(df):
+    index_names = [n for n in df.index.names if n is not None]
+    if index_names:
+        df = df.reset_index()
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind in "biuf":
+            # Straight from numpy: NaN stays a value, so the column needs no
+            # validity bitmap and can be read back zero-copy
+            columns[str(col)] = pa.array(values.to_numpy())
+        else:
+            columns[str(col)] = pa.Array.from_pandas(values)
+    table = pa.table(columns)
+    return table.replace_schema_metadata({INDEX_KEY: "\x1f".join(index_names).encode("utf-8")})
+
+
+def export(name, df, folder):
+    os.makedirs(folder, exist_ok=True)
+    tmp = _path(folder, name) + ".tmp"
+    table = _to_arrow(df)
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(len(df), 1))  # one chunk per column
+    os.replace(tmp, _path(folder, name))
+
+
+def attach(name, folder, not_before_ns=0):
+    """DataFrame over the memory-mapped snapshot of `name`, or None if absent
+    or written before `not_before_ns` (its source changed since)."""
+    path = _path(folder, name)
+    if not os.path.exists(path) or os.stat(path).st_mtime_ns < not_before_ns:
+        return None
+    source = pa.memory_map(path, "r")
+    mapped = source.read_buffer()  # the whole mapping, zero-copy
+    source.seek(0)
+    table = pa.ipc.open_file(source).read_all()
+    columns = {}
+    for field, column in zip(table.schema, table.columns):
+        # combine_chunks() copies even a single chunk: take it as is
+        chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        try:
+            columns[field.name] = chunk.to_numpy(zero_copy_only=True)
+        except (pa.ArrowInvalid, NotImplementedError):
+            columns[field.name] = chunk.to_pandas().array
+    index_names = (table.schema.metadata or {}).get(INDEX_KEY, b"").decode("utf-8")
+    index = None
+    if index_names:
+        # Built up front: set_index() would copy the value columns
+        levels = [pd.Index(columns.pop(level), name=level) for level in index_names.split("\x1f")]
+        index = levels[0] if len(levels) == 1 else pd.MultiIndex.from_arrays(levels)
+    # copy=False keeps one block per column, i.e. no consolidation copy
+    df = pd.DataFrame(columns, index=index, copy=False)
+    df.attrs[MAPPING_ATTR] = (mapped.address, mapped.size)
+    return df
+
+
+def export_all(folder, names=None):
+    """Load every registered dataset once and snapshot it into `folder`."""
+    from datasets import registry
+
+    exported = []
+    for name in names or registry.registered():
+        try:
+            export(name, registry.get(name), folder)
+            exported.append(name)
+        except (OSError, ValueError, KeyError, pa.ArrowException) as e:
+            print(f"Shared snapshot skipped for {name}: {e}")
+    return exported
+
+
+def is_zero_copy(df):
+    """True if every numeric column of `df` lies inside the memory-mapped
+    snapshot it was attached from (False for frames not from attach())."""
+    mapping = df.attrs.get(MAPPING_ATTR)
+    if mapping is None:
+        return False
+    start, size = mapping
+    for col in df.columns:
+        if df[col].dtype.kind not in "biuf":
+            continue
+        values = np.asarray(df[col])
+        address = values.__array_interface__["data"][0]
+        if not start <= address <= address + values.nbytes <= start + size:
+            return False
+    return True
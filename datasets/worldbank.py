@@ -0,0 +1,67 @@
+# worldbank.py: the three World Bank API_* indicators as one long table
+#
+# The raw files are wide (one column per year). They are melted once, at
+# first use, into a single table with columns
+#     Country Name (categorical), Country Code (categorical), Year, value
+# indexed by (indicator, Country Name) and sorted, so a callback's country
+# filter is an index slice instead of an isin + melt per request.
+
+import pandas as pd
+
+from datasets import registry
+
+INDICATORS = {
+    "gdp": "world_gdp",
+    "inflation": "world_inflation",
+    "unemployment": "world_unemployment",
+}
+
+
+def build_indicators_long():
+    parts = []
+    for indicator, source in INDICATORS.items():
+        wide = registry.get(source)
+        year_cols = [col for col in wide.columns if col.isdigit()]
+        long = wide.melt(
+            id_vars=["Country Name", "Country Code"],
+            value_vars=year_cols,
+            var_name="Year",
+            value_name="value",
+        )
+        long["indicator"] = indicator
+        parts.append(long)
+
+    table = pd.concat(parts, ignore_index=True)
+    table = table.dropna(subset=["Country Name"])
+    table["Year"] = table["Year"].astype("int16")
+    table["Country Code"] = table["Country Code"].astype("category")
+    table["Country Name"] = table["Country Name"].astype("category")
+    table["indicator"] = table["indicator"].astype("category")
+    return table.set_index(["indicator", "Country Name"]).sort_index()
+
+
+def countries():
+    """Country names available in the World Bank files."""
+    return registry.get("world_indicators").index.levels[1].tolist()
+
+
+def indicator_frame(indicator, selected_countries, since_year=None, value_name="value"):
+    """Rows of `indicator` for `selected_countries`, ready for px.line.
+
+    Returns columns Country Name, Year and `value_name`."""
+    table = registry.get("world_indicators").loc[indicator]
+    wanted = table.index.intersection(pd.Index(selected_countries or []))
+    sub = table.loc[wanted, ["Year", "value"]]
+    if since_year is not None:
+        sub = sub[sub["Year"] >= since_year]
+    sub = sub.rename_axis("Country Name").reset_index().rename(columns={"value": value_name})
+    # Plain strings: plotly.express would otherwise draw a trace per unused category
+    sub["Country Name"] = sub["Country Name"].astype(str)
+    return sub
+
+
+registry.derive(
+    "world_indicators",
+    build_indicators_long,
+    depends_on=list(INDICATORS.values()),
+)
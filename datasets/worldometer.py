@@ -0,0 +1,426 @@
+# worldometer.py: chunked ingest of the worldometer daily health data
+#
+# The daily per-country file grows without bound, so it is never parsed in
+# one piece. It is streamed in CHUNK_ROWS slices, and each slice is:
+#   - projected on the columns the dashboards use (COLUMNS)
+#   - given dates parsed with an explicit DATE_FORMAT
+#   - downcast to float32 metrics where every value survives it (the
+#     schema.py rule: large exact counts stay float64)
+# and then written as one Parquet file per country. A second pass over
+# batches of whole countries adds the derived metrics (rolling averages,
+# growth rate, doubling time, per-million values; add_metrics()) with one
+# groupby per batch, and leaves a single file per country:
+#     CACHE_DIR/worldometer-<key>/<country>/data.parquet
+# Peak memory is bounded by the chunk size, not the file size. The key
+# covers the file's mtime and size as the registry snapshotted them
+# (registry.stamp), not the live file: an edited file is re-ingested by
+# registry.refresh() (the data watcher), never by a page request, and daily
+# rows stay consistent with the rollups built from the same version.
+# Callbacks read only the countries they plot (frame()); the full table is
+# still available as the "world_health" dataset.
+#
+# Weekly and monthly rollups (sum, mean and max of every metric per country)
+# are derived datasets too, so wide date ranges are plotted from a few
+# hundred rows per country instead of every day (health_frame()).
+#
+# Without pyarrow the chunks are concatenated in memory instead.
+
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from datasets import columnar_cache, registry, schema
+
+COLUMNS = [
+    "date",
+    "country",
+    "cumulative_total_cases",
+    "daily_new_cases",
+    "active_cases",
+    "cumulative_total_deaths",
+    "daily_new_deaths",
+]
+RAW_METRICS = COLUMNS[2:]
+DERIVED_METRICS = [
+    "daily_new_cases_7d",
+    "daily_new_cases_14d",
+    "daily_new_deaths_7d",
+    "daily_new_deaths_14d",
+    "cases_growth_rate",
+    "cases_doubling_time",
+    "daily_new_cases_per_million",
+    "daily_new_deaths_per_million",
+    "active_cases_per_million",
+]
+METRICS = RAW_METRICS + DERIVED_METRICS
+# Only offered when the summary file giving the populations is present
+PER_MILLION = [metric for metric in DERIVED_METRICS if metric.endswith("_per_million")]
+
+# Radio options of the health charts, in display order
+METRIC_LABELS = {
+    "daily_new_cases": "Daily New Cases",
+    "active_cases": "Active Cases",
+    "daily_new_deaths": "Daily New Deaths",
+    "daily_new_cases_7d": "New Cases (7-day avg)",
+    "daily_new_cases_14d": "New Cases (14-day avg)",
+    "daily_new_deaths_7d": "New Deaths (7-day avg)",
+    "daily_new_deaths_14d": "New Deaths (14-day avg)",
+    "cases_growth_rate": "Case Growth Rate (%/day)",
+    "cases_doubling_time": "Case Doubling Time (days)",
+    "daily_new_cases_per_million": "New Cases per Million (7-day avg)",
+    "daily_new_deaths_per_million": "New Deaths per Million (7-day avg)",
+    "active_cases_per_million": "Active Cases per Million",
+}
+
+DATE_FORMAT = "%Y-%m-%d"
+CHUNK_ROWS = int(os.environ.get("COVID_EDA_CHUNK_ROWS", "100000"))
+# Countries whose daily rows are kept in memory per process (frame())
+COUNTRY_CACHE = int(os.environ.get("COVID_EDA_COUNTRY_CACHE", "64"))
+DATASET = "world_health"
+# Optional worldometer summary file, source of the per-million denominators
+POPULATION = "world_health_population"
+
+
+# --------------------------------------------------
+# Ingest
+# --------------------------------------------------
+def _chunks(path, chunk_rows=None):
+    # Raw headers are matched case- and space-insensitively, as before
+    header = pd.read_csv(path, nrows=0).columns
+    names = {col: col.strip().lower() for col in header if col.strip().lower() in COLUMNS}
+    missing = set(COLUMNS) - set(names.values())
+    if missing:
+        raise KeyError(f"{path} lacks columns {sorted(missing)}")
+
+    reader = pd.read_csv(path, usecols=list(names), dtype=str, chunksize=chunk_rows or CHUNK_ROWS)
+    for chunk in reader:
+        chunk = chunk.rename(columns=names)[COLUMNS]
+        chunk["date"] = pd.to_datetime(chunk["date"], format=DATE_FORMAT, errors="coerce")
+        for col in RAW_METRICS:
+            values = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+            chunk[col] = values.astype("float32") if schema._fits_float32(values.to_numpy()) else values
+        yield chunk.dropna(subset=["country"])
+
+
+def _population_stamp():
+    try:
+        st = os.stat(registry.source_path(POPULATION))
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def metric_labels():
+    """METRIC_LABELS the charts can draw: without the population summary
+    file the per-million metrics are all NaN and are left out."""
+    if _population_stamp() is not None:
+        return METRIC_LABELS
+    return {metric: label for metric, label in METRIC_LABELS.items() if metric not in PER_MILLION}
+
+
+def _population():
+    """Population by country, or an empty Series if the summary file is missing."""
+    try:
+        summary = registry.get(POPULATION)
+    except (OSError, KeyError) as e:
+        print(f"Per-million health metrics unavailable: {e}")
+        return pd.Series(dtype="float64")
+    summary = summary.rename(columns=lambda col: col.strip().lower())
+    population = pd.to_numeric(summary["population"], errors="coerce")
+    return population.set_axis(summary["country"]).dropna()
+
+
+def add_metrics(df, population):
+    """Append DERIVED_METRICS to `df`, which holds whole countries.
+
+    One groupby over the batch: rolling means are computed per country with
+    groupby().rolling, growth with groupby().shift, everything else is
+    column arithmetic."""
+    df = df.sort_values(["country", "date"], kind="stable", ignore_index=True)
+    by_country = df.groupby("country", sort=False)
+    out = {}
+
+    def rolling_mean(values, days):
+        rolled = values.groupby(df["country"], sort=False).rolling(days, min_periods=1).mean()
+        return rolled.reset_index(level=0, drop=True)
+
+    for metric in ("daily_new_cases", "daily_new_deaths"):
+        values = df[metric].astype("float64")
+        for days in (7, 14):
+            out[f"{metric}_{days}d"] = rolling_mean(values, days)
+
+    # Day-over-day growth of the running total, smoothed over a week
+    total = df["cumulative_total_cases"].astype("float64")
+    previous = by_country["cumulative_total_cases"].shift(1).astype("float64")
+    growth = rolling_mean(total / previous.where(previous > 0) - 1, 7)
+    out["cases_growth_rate"] = growth * 100
+    out["cases_doubling_time"] = np.log(2) / np.log1p(growth.where(growth > 0))
+
+    per_million = 1e6 / df["country"].map(population).astype("float64")
+    out["daily_new_cases_per_million"] = out["daily_new_cases_7d"] * per_million
+    out["daily_new_deaths_per_million"] = out["daily_new_deaths_7d"] * per_million
+    out["active_cases_per_million"] = df["active_cases"].astype("float64") * per_million
+
+    derived = pd.DataFrame(out).astype("float32")
+    return pd.concat([df, derived[DERIVED_METRICS]], axis=1)
+
+
+_INGEST_LOCK = threading.Lock()  # one ingest at a time; the others then find its folder
+
+
+def partition_dir(path, stamp):
+    """Partition folder of `path` at file version `stamp` (mtime_ns, size)."""
+    options = sorted({
+        "columns": tuple(COLUMNS),
+        "metrics": tuple(METRICS),
+        "date_format": DATE_FORMAT,
+        "float32": "exact",  # counts keep float64 when float32 would round them
+        "population": _population_stamp(),
+    }.items())
+    raw = repr((os.path.abspath(path), stamp, options))
+    key = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(columnar_cache.CACHE_DIR, f"worldometer-{key}")
+
+
+def _remove_stale(keep):
+    for entry in os.listdir(columnar_cache.CACHE_DIR):
+        full = os.path.join(columnar_cache.CACHE_DIR, entry)
+        if entry.startswith("worldometer-") and full not in keep:
+            shutil.rmtree(full, ignore_errors=True)
+
+
+def ingest(path, stamp=None):
+    """Partition `path` by country (once per file version `stamp`, default:
+    the registry's snapshot of it); return the folder."""
+    stamp = stamp if stamp is not None else registry.stamp(DATASET)
+    target = partition_dir(path, stamp)
+    if os.path.isdir(target):
+        return target
+    with _INGEST_LOCK:
+        if os.path.isdir(target):
+            return target  # built by the thread we waited for
+        return _ingest(path, target)
+
+
+def _ingest(path, target):
+    os.makedirs(columnar_cache.CACHE_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=columnar_cache.CACHE_DIR, suffix=".tmp")
+    raw, enriched = os.path.join(tmp, "raw"), os.path.join(tmp, "countries")
+    try:
+        for n, chunk in enumerate(_chunks(path)):
+            for country, part in chunk.groupby("country", sort=False):
+                folder = os.path.join(raw, quote(country, safe=" "))
+                os.makedirs(folder, exist_ok=True)
+                part.to_parquet(os.path.join(folder, f"part-{n:05d}.parquet"), index=False)
+
+        population = _population()
+        for batch in _country_batches(raw):
+            for country, part in add_metrics(batch, population).groupby("country", sort=False):
+                folder = os.path.join(enriched, quote(country, safe=" "))
+                os.makedirs(folder)
+                part.to_parquet(os.path.join(folder, "data.parquet"), index=False)
+        os.makedirs(enriched, exist_ok=True)
+        try:
+            os.replace(enriched, target)  # atomic: readers never see a half-written folder
+        except OSError:
+            pass  # another worker finished first; its copy is identical
+        # During a refresh the version still served stays readable until the swap
+        _remove_stale(keep={target, partition_dir(path, registry.stamp(DATASET, served=True))})
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def _empty():
+    dtypes = {"date": "datetime64[ns]", "country": "object", **{col: "float32" for col in METRICS}}
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+
+
+def _country_batches(folder):
+    """Frames of whole countries, each up to about CHUNK_ROWS rows."""
+    batch, rows = [], 0
+    for country in _partitions(folder):
+        batch.append(_read_partition(folder, country))
+        rows += len(batch[-1])
+        if rows >= CHUNK_ROWS:
+            yield pd.concat(batch, ignore_index=True)
+            batch, rows = [], 0
+    if batch:
+        yield pd.concat(batch, ignore_index=True)
+
+
+def _read_partition(folder, country):
+    country_dir = os.path.join(folder, quote(country, safe=" "))
+    if not country or not os.path.isdir(country_dir):
+        return _empty()
+    parts = [pd.read_parquet(os.path.join(country_dir, f)) for f in sorted(os.listdir(country_dir))]
+    return pd.concat(parts, ignore_index=True).sort_values("date", kind="stable")
+
+
+@functools.lru_cache(maxsize=COUNTRY_CACHE)
+def _country_frame(folder, country):
+    # Cached per (file version, country); callers must not modify the result
+    return _read_partition(folder, country)
+
+
+# --------------------------------------------------
+# Queries
+# --------------------------------------------------
+def load(path):
+    """The whole projected table; registry reader for DATASET."""
+    if not columnar_cache.HAS_PYARROW:
+        return add_metrics(pd.concat(_chunks(path), ignore_index=True), _population())
+    folder = ingest(path)
+    # Straight from the partitions: the per-country cache is for frame()
+    return pd.concat(
+        [_read_partition(folder, c) for c in _partitions(folder)], ignore_index=True
+    )
+
+
+def _partitions(folder):
+    return sorted(unquote(entry) for entry in os.listdir(folder))
+
+
+def countries():
+    """Countries present in the daily data."""
+    if not columnar_cache.HAS_PYARROW:
+        return sorted(registry.get(DATASET)["country"].unique().tolist())
+    return _partitions(ingest(registry.source_path(DATASET)))
+
+
+def frame(selected_countries):
+    """Rows for `selected_countries` only, read from their partitions."""
+    if not columnar_cache.HAS_PYARROW:
+        df = registry.get(DATASET)
+        df = df[df["country"].isin(selected_countries)]
+        # Plain strings: plotly.express would otherwise draw a trace per unused category
+        return df.assign(country=df["country"].astype(str))
+    folder = ingest(registry.source_path(DATASET))
+    parts = [_country_frame(folder, c) for c in selected_countries or ()]
+    if not parts:
+        return _empty()
+    return pd.concat(parts, ignore_index=True)
+
+
+# --------------------------------------------------
+# Rollups
+# --------------------------------------------------
+GRANULARITIES = ("daily", "weekly", "monthly")
+STATS = ("sum", "mean", "max")
+
+# What one point of a weekly/monthly chart shows: new cases and deaths add
+# up over the period, averages, rates and running totals do not
+DEFAULT_STAT = {
+    "cumulative_total_cases": "max",
+    "daily_new_cases": "sum",
+    "active_cases": "mean",
+    "cumulative_total_deaths": "max",
+    "daily_new_deaths": "sum",
+    **{metric: "mean" for metric in DERIVED_METRICS},
+}
+
+# "auto" granularity: the coarsest level keeping this many points visible
+AUTO_MIN_POINTS = 60
+
+
+def _aggregate(df, granularity):
+    # Weeks start on Monday, months on the 1st
+    freq = "W-SUN" if granularity == "weekly" else "M"
+    period = df["date"].dt.to_period(freq).dt.start_time.rename("date")
+    values = df[METRICS].astype("float64")  # accumulate in double precision
+    grouped = values.groupby([df["country"], period], observed=True)
+    # min_count=1: a period without any value sums to NaN, not to a real-looking 0
+    parts = {"sum": grouped.sum(min_count=1), "mean": grouped.mean(), "max": grouped.max()}
+    table = pd.concat([parts[stat] for stat in STATS], axis=1, keys=STATS).swaplevel(axis=1)
+    table = table[[(metric, stat) for metric in METRICS for stat in STATS]]
+    table.columns = [f"{metric}_{stat}" for metric, stat in table.columns]
+    return schema.compact(table)
+
+
+def build_rollup(granularity):
+    """Per (country, period start) sum/mean/max of every metric."""
+    if not columnar_cache.HAS_PYARROW:
+        return _aggregate(registry.get(DATASET), granularity).sort_index()
+    # Batches of whole countries: building never holds the whole daily
+    # table and no period is split across batches
+    folder = ingest(registry.source_path(DATASET))
+    parts = [_aggregate(batch, granularity) for batch in _country_batches(folder)]
+    return pd.concat(parts).sort_index()
+
+
+def pick_granularity(start, end):
+    """Coarsest granularity still showing AUTO_MIN_POINTS points over [start, end]."""
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days
+    if days >= 30 * AUTO_MIN_POINTS:
+        return "monthly"
+    if days >= 7 * AUTO_MIN_POINTS:
+        return "weekly"
+    return "daily"
+
+
+def auto_granularity(selected_countries, x_range=None):
+    """Granularity for the zoom window `x_range`, else the countries' full span."""
+    if x_range and None not in x_range:
+        return pick_granularity(*x_range)
+    dates = health_frame(selected_countries, METRICS[0], "monthly")["date"]
+    if dates.empty:
+        return "daily"
+    start, end = dates.min(), dates.max() + pd.offsets.MonthEnd(0)
+    if x_range:
+        # One end dragged: the other stays at the data's edge
+        start = x_range[0] if x_range[0] is not None else start
+        end = x_range[1] if x_range[1] is not None else end
+    return pick_granularity(start, end)
+
+
+def health_frame(selected_countries, metric, granularity="daily", stat=None):
+    """date / country / `metric` rows at the requested granularity.
+
+    Weekly and monthly values come from the rollup tables, aggregated with
+    `stat` (default: DEFAULT_STAT[metric])."""
+    if granularity == "daily":
+        return frame(selected_countries)[["date", "country", metric]]
+    table = registry.get(f"{DATASET}_{granularity}")
+    present = [c for c in selected_countries or () if c in table.index.levels[0]]
+    column = f"{metric}_{stat or DEFAULT_STAT[metric]}"
+    rows = table.loc[present, [column]] if present else table.iloc[:0][[column]]
+    return rows.rename(columns={column: metric}).reset_index()[["date", "country", metric]]
+
+
+
+def health_table(selected_countries, granularity="daily"):
+    """date / country and every metric_labels() metric, each with its DEFAULT_STAT
+    for weekly and monthly rows (one frame for all the metrics a chart offers)."""
+    metrics = list(metric_labels())
+    if granularity == "daily":
+        return frame(selected_countries)[["date", "country", *metrics]]
+    table = registry.get(f"{DATASET}_{granularity}")
+    present = [c for c in selected_countries or () if c in table.index.levels[0]]
+    columns = {f"{metric}_{DEFAULT_STAT[metric]}": metric for metric in metrics}
+    rows = table.loc[present, list(columns)] if present else table.iloc[:0][list(columns)]
+    return rows.rename(columns=columns).reset_index()[["date", "country", *metrics]]
+
+def _on_refresh(names):
+    if DATASET in names:
+        _country_frame.cache_clear()
+        if columnar_cache.HAS_PYARROW:
+            # Usually built already by the rollups' rebuild; then drops the old version
+            path = registry.source_path(DATASET)
+            _remove_stale(keep={ingest(path)})
+
+
+registry.subscribe(_on_refresh)
+
+for _granularity in GRANULARITIES[1:]:
+    registry.derive(
+        f"{DATASET}_{_granularity}",
+        functools.partial(build_rollup, _granularity),
+        depends_on=(DATASET,),
+    )
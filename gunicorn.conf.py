@@ -0,0 +1,42 @@
+# gunicorn.conf.py: multi-worker deployment of the dashboards
+#
+#     gunicorn -c gunicorn.conf.py wsgi:server
+#
+# Before forking, the master loads every registered dataset once and writes
+# it as an Arrow file under COVID_EDA_SHARED_DIR (datasets/shared.py).
+# Workers memory-map those files instead of parsing Data/, so their numeric
+# columns point at the same physical pages and memory stays roughly flat as
+# the worker count grows.
+#
+# Settings (environment):
+#   COVID_EDA_WORKERS     number of worker processes (default: CPU count)
+#   COVID_EDA_BIND        listen address (default: 0.0.0.0:8050)
+#   COVID_EDA_SHARED_DIR  snapshot folder (default: .cache/shared)
+#   COVID_EDA_RESULT_DIR  result store folder shared by the workers
+#                         (default: .cache/results)
+
+import os
+import time
+
+bind = os.environ.get("COVID_EDA_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("COVID_EDA_WORKERS", os.cpu_count() or 1))
+timeout = 120
+
+# A dcc.Store key written by one worker must resolve in the others
+os.environ.setdefault("COVID_EDA_RESULT_DIR", os.path.join(".cache", "results"))
+
+
+def on_starting(server):
+    from datasets import shared
+
+    if not shared.HAS_PYARROW:
+        server.log.warning("pyarrow missing: every worker will load its own datasets")
+        return
+    folder = os.environ.get(shared.SHARED_DIR_ENV) or os.path.join(".cache", "shared")
+    os.environ.pop(shared.SHARED_DIR_ENV, None)  # the master reads the sources themselves
+    start = time.perf_counter()
+    exported = shared.export_all(folder)
+    server.log.info(f"Shared {len(exported)} datasets in {folder} "
+                    f"({time.perf_counter() - start:.1f}s)")
+    # Inherited by the workers, which attach instead of parsing
+    os.environ[shared.SHARED_DIR_ENV] = folder
@@ -0,0 +1 @@
+# services: request-time helpers shared by the pages (result storage, caches)
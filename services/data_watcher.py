@@ -0,0 +1,57 @@
+# data_watcher.py: pick up edited files in Data/ without restarting workers
+#
+# A daemon thread polls the files of the datasets this process has loaded
+# (their mtime and size) every WATCH_SECONDS. When some changed, it calls
+# datasets.registry.refresh(), which rebuilds them and the derived tables
+# built from them and swaps them in together, while requests keep being
+# served from the previous frames. Then only the cached figures depending on
+# the replaced datasets are dropped (figure_cache, static_figures); the
+# data-level caches (wide_series tables, worldometer partitions, page
+# lru_caches) are subscribed to the registry and clear themselves.
+#
+# Each worker process runs its own watcher. COVID_EDA_WATCH_SECONDS=0
+# disables it.
+
+import os
+import threading
+import time
+
+from datasets import registry
+from services import static_figures
+from services.figure_cache import figure_cache
+
+WATCH_SECONDS = float(os.environ.get("COVID_EDA_WATCH_SECONDS", "5"))
+
+_thread = None
+
+
+def refresh_changed():
+    """One poll: refresh the datasets whose file changed; return their dependents."""
+    stale = registry.stale_sources()
+    if not stale:
+        return []
+    start = time.perf_counter()
+    replaced = registry.refresh(stale)
+    figure_cache.invalidate_datasets(replaced)
+    static_figures.invalidate_datasets(replaced)
+    print(f"Data refresh: {', '.join(stale)} changed, "
+          f"{len(replaced)} datasets rebuilt in {time.perf_counter() - start:.2f}s")
+    return replaced
+
+
+def _run(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            refresh_changed()
+        except Exception as e:
+            # A file caught mid-write fails to parse: keep the old data, retry next poll
+            print(f"Data refresh failed, serving previous data: {e}")
+
+
+def start(interval=WATCH_SECONDS):
+    global _thread
+    if interval <= 0 or _thread is not None:
+        return
+    _thread = threading.Thread(target=_run, args=(interval,), name="data-watcher", daemon=True)
+    _thread.start()
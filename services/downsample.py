@@ -0,0 +1,118 @@
+# downsample.py: server-side downsampling for long daily series
+#
+# Daily price and health series have thousands of points per trace, far more
+# than a chart a few hundred pixels wide can show. Callbacks send at most
+# POINT_BUDGET points per trace, picked with LTTB (largest-triangle-three-
+# buckets, keeps the visual shape) or min/max bucketing (keeps extremes).
+#
+# The budget applies to the visible x range: charts pass their relayoutData
+# through x_range_from_relayout(), slice the data to that window and
+# downsample again, so zooming in re-queries at higher detail and payload size
+# stays flat however much history the file holds.
+
+import numpy as np
+import pandas as pd
+
+POINT_BUDGET = 800
+WINDOW_MARGIN = 0.1  # extra data on each side of the zoom window, for panning
+
+
+# --------------------------------------------------
+# Point selection
+# --------------------------------------------------
+def lttb_indices(x, y, budget):
+    """Indices of the `budget` points LTTB keeps from (x, y); x must be sorted."""
+    n = len(x)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    every = (n - 2) / (budget - 2)
+    bounds = (np.floor(np.arange(budget) * every) + 1).astype(np.int64)
+    bounds[-1] = n - 1
+
+    keep = np.empty(budget, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_end = min(bounds[i + 2] if i + 2 < budget else n, n)
+        if end < next_end:
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax_indices(y, budget):
+    """Indices of the min and max of each of budget // 2 equal buckets."""
+    n = len(y)
+    if budget >= n or budget < 2:
+        return np.arange(n)
+
+    buckets = budget // 2
+    size = int(np.ceil(n / buckets))
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lo = offsets + np.nanargmin(grid, axis=1)
+    hi = offsets + np.nanargmax(grid, axis=1)
+    return np.unique(np.concatenate([lo, hi, [0, n - 1]]))
+
+
+def downsample(df, x, y, budget=POINT_BUDGET, method="lttb", group=None):
+    """Rows of `df` to plot for the line `y` against `x` (one trace per `group`)."""
+    if group is not None:
+        parts = [
+            downsample(part, x, y, budget, method)
+            for _, part in df.groupby(group, sort=False, observed=True)
+        ]
+        return pd.concat(parts) if parts else df
+
+    df = df.dropna(subset=[y]).sort_values(x)
+    if len(df) <= budget:
+        return df
+    xs = df[x]
+    if not pd.api.types.is_numeric_dtype(xs):
+        xs = pd.to_datetime(xs).astype("int64")
+    if method == "minmax":
+        keep = minmax_indices(df[y].to_numpy(dtype="float64"), budget)
+    else:
+        keep = lttb_indices(xs.to_numpy(), df[y].to_numpy(), budget)
+    return df.iloc[keep]
+
+
+# --------------------------------------------------
+# Zoom window
+# --------------------------------------------------
+def x_range_from_relayout(relayout_data, axis="xaxis"):
+    """(start, end) of a zoomed x axis from dcc.Graph relayoutData, else None.
+    An end the relayout did not report is None (open on that side)."""
+    if not relayout_data or relayout_data.get(f"{axis}.autorange"):
+        return None
+    if f"{axis}.range[0]" in relayout_data or f"{axis}.range[1]" in relayout_data:
+        # Dragging one end of the axis reports only that end
+        return relayout_data.get(f"{axis}.range[0]"), relayout_data.get(f"{axis}.range[1]")
+    if f"{axis}.range" in relayout_data:
+        start, end = relayout_data[f"{axis}.range"]
+        return start, end
+    return None
+
+
+def window(df, x, x_range, margin=WINDOW_MARGIN):
+    """Rows of `df` inside `x_range`, widened by `margin` of its span on each side."""
+    if x_range is None:
+        return df
+    xs = pd.to_datetime(df[x])
+    start = pd.to_datetime(x_range[0]) if x_range[0] is not None else xs.min()
+    end = pd.to_datetime(x_range[1]) if x_range[1] is not None else xs.max()
+    pad = (end - start) * margin
+    return df[(xs >= start - pad) & (xs <= end + pad)]
@@ -0,0 +1,155 @@
+# figure_cache.py: bounded LRU of built figures for the country-dropdown callbacks
+#
+# Many users pick the same countries, so the figure for a given
+# (callback, selection, metric) is built once and its JSON reused. On a hit
+# the callback returns the cached figure dict without touching pandas or
+# plotly.express.
+#
+#     @dash.callback(Output(...), Input(...))
+#     @figure_cache.memoize("update_gdp")
+#     def update_gdp(selected_countries): ...
+#
+# The first argument is treated as the selection: in the key a list is
+# de-duplicated and sorted, so ["India", "France"] and ["France", "India"]
+# share one entry; the builder still gets the user's order, and a hit is
+# returned with its traces in the order of the request's selection. Anything
+# else a builder derives from the selection (a title, ...) should use
+# normalize_selection() so it reads the same for every order. Remaining
+# arguments (metric, zoom range, ...) are part of the key as given.
+#
+# memoize(..., datasets=[...]) names the registry datasets a callback reads:
+# when a data refresh replaces one of them (datasets.registry.refresh), only
+# the entries of the callbacks depending on it are dropped.
+#
+# memoize(..., x_range_arg=i) marks argument i as a zoom window: figures for a
+# zoomed window (argument not None) go to a small separate LRU, so zooming
+# and panning never evict the dropdown figures.
+
+import collections
+import functools
+import json
+import threading
+
+
+def normalize_selection(selection):
+    if isinstance(selection, (list, tuple)):
+        return sorted(set(selection))
+    return selection
+
+
+def in_selection_order(figure, selection):
+    """`figure` with its traces in the order of `selection` (matched on trace
+    name); a new dict, the cached one is shared between requests."""
+    if not isinstance(selection, (list, tuple)) or not isinstance(figure, dict):
+        return figure
+    data = figure.get("data") or []
+    position = {item: i for i, item in enumerate(dict.fromkeys(selection))}
+    last = len(position)
+    ordered = sorted(data, key=lambda trace: position.get(trace.get("name"), last))
+    if all(a is b for a, b in zip(ordered, data)):
+        return figure
+    return {**figure, "data": ordered}
+
+
+ZOOM_ITEMS = 32
+
+
+class FigureCache:
+    def __init__(self, max_items=256, zoom_items=ZOOM_ITEMS):
+        self.max_items = max_items
+        self.zoomed = FigureCache(zoom_items, zoom_items=0) if zoom_items else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = collections.OrderedDict()
+        self._depends = {}   # callback name -> dataset names
+        self._generation = 0  # bumped by invalidate(): in-flight builds are not stored
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, figure_json, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # built from data replaced meanwhile
+            self._items[key] = figure_json
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, callback_name=None):
+        """Drop every entry, or only those built by `callback_name`."""
+        if self.zoomed is not None:
+            self.zoomed.invalidate(callback_name)
+        with self._lock:
+            self._generation += 1
+            if callback_name is None:
+                self._items.clear()
+                return
+            for key in [k for k in self._items if k[0] == callback_name]:
+                del self._items[key]
+
+    def depend(self, callback_name, datasets):
+        """Record that `callback_name` builds its figures from `datasets`."""
+        self._depends.setdefault(callback_name, set()).update(datasets)
+
+    def invalidate_datasets(self, names):
+        """Drop the entries of every callback reading one of `names`."""
+        for callback_name, datasets in list(self._depends.items()):
+            if datasets & set(names):
+                self.invalidate(callback_name)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        if self.zoomed is not None:
+            stats.update({f"zoom_{stat}": value for stat, value in self.zoomed.stats().items()})
+        return stats
+
+    def memoize(self, callback_name, selection=True, datasets=(), x_range_arg=None):
+        """Cache the figure returned by `func`. With selection=False the
+        first argument is keyed as given instead of being normalized;
+        `datasets` are the registry datasets the figure is built from;
+        argument `x_range_arg`, when not None, is a zoom window."""
+        self.depend(callback_name, datasets)
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                key_args = args
+                if selection and args:
+                    key_args = (normalize_selection(args[0]), *args[1:])
+                cache = self
+                if self.zoomed is not None and x_range_arg is not None and x_range_arg < len(args) \
+                        and args[x_range_arg] is not None:
+                    cache = self.zoomed
+                key = (callback_name, json.dumps(key_args, sort_keys=True, default=str))
+                cached = cache.get(key)
+                if cached is not None:
+                    # Possibly built for the same countries picked in another order
+                    return in_selection_order(cached, args[0]) if selection and args else cached
+                generation = cache._generation
+                fig = func(*args)
+                # Plain JSON types: safe to hand the same object to every request
+                figure_json = json.loads(fig.to_json()) if hasattr(fig, "to_json") else fig
+                cache.put(key, figure_json, generation)
+                return figure_json
+            return wrapper
+        return decorator
+
+
+figure_cache = FigureCache()
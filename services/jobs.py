@@ -0,0 +1,141 @@
+# jobs.py: heavy callback work off the request thread, on a local process pool
+#
+# A callback submits the slow part (an ETL, a big parse) and returns a job id
+# at once; the page then polls status() with a dcc.Interval and shows the
+# progress reported by the job. No outside service is needed:
+#   - jobs run in a ProcessPoolExecutor (JOB_WORKERS processes, spawned on
+#     first use), so they hold neither the request thread nor the GIL
+#   - each job's state lives in a small JSON file under JOB_DIR, written by
+#     the job itself (progress) and by the submitting process (result), so
+#     any worker process of the host can answer a poll
+#   - the job id is a hash of (name, args): submitting a job identical to
+#     one still running returns the running job's id instead of a new job
+#
+#     job_id = jobs.submit("djamel", build_table, on_done=store_result)
+#     jobs.status(job_id)  # {"state": "running", "progress": 0.4, "message": ...}
+#
+# `fn` must be importable (a module-level function) and accept a `progress`
+# keyword: progress(fraction, message). `on_done(result)` runs in the
+# submitting process; its return value, which must be JSON-serializable, is
+# the job's result.
+#
+# Job ids come back from the browser (dcc.Store): status() only accepts the
+# exact format job_id_for() produces, so an id never names a file outside
+# JOB_DIR.
+
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+
+JOB_WORKERS = int(os.environ.get("COVID_EDA_JOB_WORKERS", "2"))
+JOB_DIR = os.environ.get("COVID_EDA_JOB_DIR") or os.path.join(tempfile.gettempdir(), "covid-eda-jobs")
+# A "running" state not updated for this long belongs to a dead process
+STALE_SECONDS = float(os.environ.get("COVID_EDA_JOB_STALE_SECONDS", "600"))
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+_pool = None
+_futures = {}  # job id -> Future, for jobs submitted by this process
+_lock = threading.Lock()
+
+
+# --------------------------------------------------
+# Job state files
+# --------------------------------------------------
+def valid_job_id(job_id):
+    return isinstance(job_id, str) and JOB_ID_PATTERN.fullmatch(job_id) is not None
+
+
+def _state_path(job_id):
+    if not valid_job_id(job_id):
+        raise ValueError(f"invalid job id {job_id!r}")
+    return os.path.join(JOB_DIR, f"{job_id}.json")
+
+
+def _write_state(job_id, **state):
+    os.makedirs(JOB_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=JOB_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump({**state, "updated": time.time()}, f)
+    os.replace(tmp, _state_path(job_id))  # pollers never read a partial file
+
+
+def status(job_id):
+    """{"state": "running" | "done" | "error" | "unknown", "progress", "message", "result"}"""
+    try:
+        with open(_state_path(job_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError, TypeError):
+        return {"state": "unknown", "progress": 0.0, "message": "", "result": None}
+
+
+class Progress:
+    """Picklable progress reporter handed to the job."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def __call__(self, fraction, message=""):
+        _write_state(self.job_id, state="running", progress=float(fraction), message=message, result=None)
+
+
+# --------------------------------------------------
+# Submission
+# --------------------------------------------------
+def job_id_for(name, args=()):
+    return hashlib.sha1(repr((name, args)).encode("utf-8")).hexdigest()[:16]
+
+
+def _in_flight(job_id):
+    future = _futures.get(job_id)
+    if future is not None:
+        return not future.done()
+    # Submitted by another worker process of this host
+    state = status(job_id)
+    return state["state"] == "running" and time.time() - state.get("updated", 0) < STALE_SECONDS
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        # spawn: the children do not inherit this process's threads and locks
+        _pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=JOB_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _finish(job_id, future, on_done):
+    try:
+        result = future.result()
+        if on_done is not None:
+            result = on_done(result)
+        _write_state(job_id, state="done", progress=1.0, message="", result=result)
+    except Exception as e:
+        print(f"Background job {job_id} failed: {e}")
+        _write_state(job_id, state="error", progress=1.0, message=f"{type(e).__name__}: {e}", result=None)
+
+
+def submit(name, fn, args=(), on_done=None):
+    """Run fn(*args, progress=...) in the pool and return the job id."""
+    job_id = job_id_for(name, args)
+    with _lock:
+        if _in_flight(job_id):
+            return job_id
+        Progress(job_id)(0.0)
+        future = _executor().submit(fn, *args, progress=Progress(job_id))
+        _futures[job_id] = future
+    future.add_done_callback(lambda f: _finish(job_id, f, on_done))
+    return job_id
+
+
+def completed(name, result, args=()):
+    """Record a job whose result is already known (nothing to run); return its id."""
+    job_id = job_id_for(name, args)
+    _write_state(job_id, state="done", progress=1.0, message="", result=result)
+    return job_id
@@ -0,0 +1,234 @@
+# metrics.py: opt-in per-callback latency instrumentation and /metrics endpoint
+#
+# Enabled by COVID_EDA_METRICS=1 (see app.py). Every registered Dash callback
+# is wrapped to record:
+#   - wall time, split into figure construction (plotly.express / go.Figure
+#     building and update_*), JSON serialization (Dash's response to_json and
+#     Figure.to_json) and the remainder, which is the pandas work
+#   - response size in bytes
+# into in-process histograms, served in Prometheus text format on
+# METRICS_ROUTE (local requests only).
+#
+# Optional sampling profiler: with COVID_EDA_PROFILE_SLOW_MS set, each
+# callback is sampled every PROFILE_INTERVAL seconds while it runs, and calls
+# slower than the threshold dump their stacks in folded ("a;b;c count")
+# format under COVID_EDA_PROFILE_DIR, ready for flamegraph.pl or speedscope.
+
+import bisect
+import collections
+import functools
+import os
+import sys
+import threading
+import time
+
+METRICS_ROUTE = "/metrics"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+PHASES = ("data", "figure", "json")
+PROFILE_INTERVAL = 0.005
+
+
+def enabled():
+    return os.environ.get("COVID_EDA_METRICS", "").lower() in ("1", "true", "yes")
+
+
+# --------------------------------------------------
+# Histograms
+# --------------------------------------------------
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f'{name}_bucket{{{labels},le="{le}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+_LATENCY = collections.defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+_PHASE_SECONDS = collections.defaultdict(float)  # (callback, phase) -> total seconds
+_SIZE = collections.defaultdict(lambda: Histogram(SIZE_BUCKETS))
+_LOCK = threading.Lock()
+
+
+def record(callback, total, phases, size):
+    with _LOCK:
+        _LATENCY[callback].observe(total)
+        for phase, seconds in phases.items():
+            _PHASE_SECONDS[(callback, phase)] += seconds
+        if size is not None:
+            _SIZE[callback].observe(size)
+
+
+def render():
+    from services.figure_cache import figure_cache
+
+    out = [
+        "# HELP dash_callback_seconds Wall time of each Dash callback.",
+        "# TYPE dash_callback_seconds histogram",
+    ]
+    with _LOCK:
+        for callback, hist in sorted(_LATENCY.items()):
+            out.extend(hist.lines("dash_callback_seconds", f'callback="{callback}"'))
+        out += [
+            "# HELP dash_callback_phase_seconds_total Callback time by phase (data = pandas and other Python).",
+            "# TYPE dash_callback_phase_seconds_total counter",
+        ]
+        for (callback, phase), seconds in sorted(_PHASE_SECONDS.items()):
+            out.append(f'dash_callback_phase_seconds_total{{callback="{callback}",phase="{phase}"}} {seconds}')
+        out += [
+            "# HELP dash_callback_response_bytes Size of each serialized callback response.",
+            "# TYPE dash_callback_response_bytes histogram",
+        ]
+        for callback, hist in sorted(_SIZE.items()):
+            out.extend(hist.lines("dash_callback_response_bytes", f'callback="{callback}"'))
+    out += ["# TYPE figure_cache gauge"]
+    for stat, value in figure_cache.stats().items():
+        out.append(f'figure_cache{{stat="{stat}"}} {value}')
+    return "\n".join(out) + "\n"
+
+
+# --------------------------------------------------
+# Phase timing (thread-local, outermost timed call wins)
+# --------------------------------------------------
+_state = threading.local()
+
+
+def _timed_phase(phase, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        phases = getattr(_state, "phases", None)
+        if phases is None or getattr(_state, "inside", False):
+            return func(*args, **kwargs)
+        _state.inside = True
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            phases[phase] += time.perf_counter() - start
+            _state.inside = False
+    wrapper._metrics_phase = phase
+    return wrapper
+
+
+def _patch(owner, attr, phase):
+    current = getattr(owner, attr)
+    if not getattr(current, "_metrics_phase", None):
+        setattr(owner, attr, _timed_phase(phase, current))
+
+
+def _patch_libraries():
+    import dash._callback
+    import plotly.express as px
+    from plotly.basedatatypes import BaseFigure
+
+    for name in ("line", "scatter", "bar", "pie"):
+        _patch(px, name, "figure")
+    for name in ("__init__", "update_layout", "update_traces", "add_trace", "add_traces"):
+        _patch(BaseFigure, name, "figure")
+    _patch(BaseFigure, "to_json", "json")
+    _patch(dash._callback, "to_json", "json")
+
+
+# --------------------------------------------------
+# Sampling profiler
+# --------------------------------------------------
+class _Sampler(threading.Thread):
+    def __init__(self, target_thread_id):
+        super().__init__(daemon=True)
+        self.target = target_thread_id
+        self.stacks = collections.Counter()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(PROFILE_INTERVAL):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def _dump_profile(callback, stacks, seconds):
+    folder = os.environ.get("COVID_EDA_PROFILE_DIR", os.path.join(".cache", "profiles"))
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{callback}-{int(time.time() * 1000)}-{int(seconds * 1000)}ms.folded")
+    with open(path, "w", encoding="utf-8") as fh:
+        for stack, count in stacks.most_common():
+            fh.write(f"{stack} {count}\n")
+
+
+# --------------------------------------------------
+# Callback wrapping
+# --------------------------------------------------
+def instrument(callback_name, func, slow_seconds=None):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _state.phases = dict.fromkeys(PHASES, 0.0)
+        sampler = None
+        if slow_seconds is not None:
+            sampler = _Sampler(threading.get_ident())
+            sampler.start()
+        result = None
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            total = time.perf_counter() - start
+            phases, _state.phases = _state.phases, None
+            phases["data"] = max(total - phases["figure"] - phases["json"], 0.0)
+            size = len(result) if isinstance(result, (str, bytes)) else None
+            record(callback_name, total, phases, size)
+            if sampler is not None:
+                sampler.done.set()
+                sampler.join()
+                if total >= slow_seconds:
+                    _dump_profile(callback_name, sampler.stacks, total)
+    wrapper._metrics_instrumented = True
+    return wrapper
+
+
+def _instrument_callbacks(app, slow_seconds):
+    for entry in app.callback_map.values():
+        func = entry.get("callback")  # clientside callbacks have none
+        if func is None or getattr(func, "_metrics_instrumented", False):
+            continue
+        entry["callback"] = instrument(f"{func.__module__}.{func.__name__}", func, slow_seconds)
+
+
+def init_app(app):
+    """Wrap every callback of `app` and serve METRICS_ROUTE on its server."""
+    from flask import Response, abort, request
+
+    _patch_libraries()
+    slow_ms = os.environ.get("COVID_EDA_PROFILE_SLOW_MS")
+    slow_seconds = float(slow_ms) / 1000 if slow_ms else None
+
+    # Dash fills app.callback_map from the page modules on the first request,
+    # so callbacks are wrapped in a hook that runs after Dash's own setup.
+    @app.server.before_request
+    def _wrap_callbacks():
+        _instrument_callbacks(app, slow_seconds)
+
+    @app.server.route(METRICS_ROUTE)
+    def _metrics():
+        if request.remote_addr not in ("127.0.0.1", "::1"):
+            abort(403)
+        return Response(render(), mimetype="text/plain; version=0.0.4")
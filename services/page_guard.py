@@ -0,0 +1,24 @@
+# page_guard.py: lazy, failure-isolated page layouts
+#
+# Pages expose `layout` as a function so Dash only loads their data when the
+# page is first visited (datasets are memoized after that). If the data a
+# page needs is missing or unreadable, the page renders an error message
+# instead of stopping the whole app from starting.
+
+import functools
+
+from dash import html
+
+
+def guarded_layout(build):
+    @functools.wraps(build)
+    def layout(**kwargs):
+        try:
+            return build(**kwargs)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Page {build.__module__} unavailable: {e}")
+            return html.Div([
+                html.H3("This dashboard is unavailable"),
+                html.P(f"Its data could not be loaded: {e}", style={"color": "red"}),
+            ], style={"textAlign": "center"})
+    return layout
@@ -0,0 +1,337 @@
+# query_api.py: read-only HTTP access to the registry datasets
+#
+# Notebooks and reports fetch the same in-memory tables the pages use,
+# instead of scraping the dashboard or re-parsing Data/:
+#
+#     GET /api/datasets                      every dataset (metadata only, nothing is loaded)
+#     GET /api/datasets/<name>?country=France&country=JPN&start=2020&end=2021-06
+#                             &columns=Price,Vol.&offset=0&limit=1000&format=json
+#
+#   - country: repeatable (or comma-separated); matches the dataset's country
+#     columns (names or ISO3 codes) or, for wide Eurostat tables with one
+#     column per country, selects those columns
+#   - start / end: "2020", "2020-03" or "2020-03-15", both ends included;
+#     applies to the date/time column, or to the year columns of the wide
+#     World Bank tables
+#   - offset / limit: pagination over rows (limit <= MAX_LIMIT); the total
+#     row count is in X-Total-Count and the next page in a Link header
+#   - format: "json" (records, ISO dates, float32 columns written at their
+#     source precision) or "arrow" (Arrow IPC stream, written batch by batch
+#     straight from the frame; needs pyarrow)
+#
+# Responses carry an ETag derived from the dataset version
+# (registry.version) and the query, so a repeated request is answered with a
+# 304, and bodies up to CACHE_ITEM_BYTES are kept in a bounded LRU; a data
+# refresh drops the entries of the replaced datasets.
+
+import collections
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+from flask import Response, request
+
+from datasets import registry, schema
+from datasets.catalog import WIDE_BY_COUNTRY
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+API_ROUTE = "/api/datasets"
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = int(os.environ.get("COVID_EDA_API_MAX_LIMIT", "100000"))
+CACHE_BYTES = int(float(os.environ.get("COVID_EDA_API_CACHE_MB", "64")) * 1e6)
+CACHE_ITEM_BYTES = CACHE_BYTES // 8
+ARROW_BATCH_ROWS = 16384
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+# Column names the datasets use for countries and for time
+COUNTRY_COLUMNS = (
+    "country", "Country", "Country Name", "Country Code", "CountryName", "CountryCode",
+    "country_name", "country_code",
+)
+TIME_COLUMNS = ("date", "Date", "Time", "Year_Month", "Year")
+
+
+class QueryError(ValueError):
+    pass
+
+
+# --------------------------------------------------
+# Response cache
+# --------------------------------------------------
+class ResponseCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items = collections.OrderedDict()  # key -> (dataset, body, headers)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            return None
+
+    def put(self, key, dataset, body, headers):
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = (dataset, body, headers)
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, (_, evicted, _) = self._items.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def invalidate_datasets(self, names):
+        with self._lock:
+            for key in [k for k, (dataset, _, _) in self._items.items() if dataset in names]:
+                self.bytes -= len(self._items.pop(key)[1])
+
+
+response_cache = ResponseCache(CACHE_BYTES)
+registry.subscribe(response_cache.invalidate_datasets)
+
+
+# --------------------------------------------------
+# Query
+# --------------------------------------------------
+def _flat(df):
+    # Index levels (country, date, ...) become ordinary columns
+    return df.reset_index() if any(level is not None for level in df.index.names) else df
+
+
+def _time_column(df):
+    return next((col for col in TIME_COLUMNS if col in df.columns), None)
+
+
+def _year_columns(df):
+    return [col for col in df.columns if isinstance(col, str) and col.isdigit() and len(col) == 4]
+
+
+def describe(name):
+    """Columns and the filters a dataset supports."""
+    df = _flat(registry.get(name))
+    countries = [col for col in COUNTRY_COLUMNS if col in df.columns]
+    time = _time_column(df)
+    return {
+        "name": name,
+        "rows": len(df),
+        "columns": [str(col) for col in df.columns],
+        "country_filter": countries or ("columns" if name in WIDE_BY_COUNTRY else None),
+        "time_filter": time or ("year columns" if _year_columns(df) else None),
+    }
+
+
+def _as_dates(values):
+    if values.dtype.kind == "M":
+        return values
+    if values.dtype.kind in "iu":
+        return pd.to_datetime(values.astype("int64").astype(str), format="%Y", errors="coerce")
+    return pd.to_datetime(values.astype(str), format="ISO8601", errors="coerce")
+
+
+def _bounds(start, end):
+    try:
+        first = pd.Period(start).start_time if start else None
+        last = pd.Period(end).end_time if end else None
+    except ValueError as e:
+        raise QueryError(f"bad date range: {e}") from None
+    return first, last
+
+
+def _filter_countries(name, df, countries):
+    if name in WIDE_BY_COUNTRY:
+        # One column per country
+        return df[[_time_column(df)] + [col for col in df.columns if col in countries]]
+    present = [col for col in COUNTRY_COLUMNS if col in df.columns]
+    if not present:
+        raise QueryError("this dataset has no country dimension")
+    keep = np.zeros(len(df), dtype=bool)
+    for col in present:
+        keep |= df[col].astype(str).isin(countries).to_numpy()
+    return df[keep]
+
+
+def _filter_time(df, start, end):
+    first, last = _bounds(start, end)
+    time = _time_column(df)
+    if time is not None:
+        dates = _as_dates(df[time])
+        keep = dates.notna()
+        if first is not None:
+            keep &= dates >= first
+        if last is not None:
+            keep &= dates <= last
+        return df[keep.to_numpy()]
+    years = _year_columns(df)
+    if not years:
+        raise QueryError("this dataset has no time dimension")
+    drop = [
+        col for col in years
+        if (first is not None and int(col) < first.year) or (last is not None and int(col) > last.year)
+    ]
+    return df.drop(columns=drop)
+
+
+def query(name, countries=(), start=None, end=None, columns=()):
+    """The rows and columns of dataset `name` matching the filters."""
+    df = _flat(registry.get(name))
+    if countries:
+        df = _filter_countries(name, df, set(countries))
+    if start or end:
+        df = _filter_time(df, start, end)
+    if columns:
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise QueryError(f"unknown columns: {missing}")
+        df = df[list(columns)]
+    return df
+
+
+# --------------------------------------------------
+# Encoding
+# --------------------------------------------------
+def _json_body(name, page, total, offset, limit):
+    head = json.dumps({"dataset": name, "total": total, "offset": offset, "limit": limit})
+    narrow = [col for col in page.columns if page[col].dtype == "float32"]
+    if narrow:
+        # to_json would write the float32 noise (2.7 -> 2.7000000477)
+        page = pd.DataFrame(
+            {col: schema.widen(page[col]) if col in narrow else page[col] for col in page.columns},
+            index=page.index,
+        )
+    # The records are written by pandas in one pass, then spliced in
+    records = page.to_json(orient="records", date_format="iso")
+    return f'{head[:-1]}, "data": {records}}}'.encode("utf-8")
+
+
+class _Chunks:
+    """File-like sink collecting what the Arrow writer emits."""
+
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def _arrow_stream(page):
+    """Arrow IPC stream of `page`, yielded one record batch at a time."""
+    table = pa.Table.from_pandas(page, preserve_index=False)
+    sink = _Chunks()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        yield sink.take()
+        for batch in table.to_batches(max_chunksize=ARROW_BATCH_ROWS):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+# --------------------------------------------------
+# Routes
+# --------------------------------------------------
+def _error(status, message):
+    return Response(json.dumps({"error": message}), status=status, mimetype="application/json")
+
+
+def _int_arg(key, default):
+    try:
+        return int(request.args.get(key, default))
+    except ValueError:
+        raise QueryError(f"{key} must be an integer") from None
+
+
+def _list_arg(key):
+    return [item for value in request.args.getlist(key) for item in value.split(",") if item]
+
+
+def _list_response():
+    # Metadata only: listing must not parse every file. Columns and filters
+    # are in describe() for datasets this process has loaded.
+    listing = []
+    for name in registry.registered():
+        entry = {"name": name, **registry.info(name)}
+        if entry["loaded"]:
+            try:
+                entry.update(describe(name))
+            except (OSError, KeyError, ValueError) as e:
+                entry["error"] = str(e)
+        listing.append(entry)
+    return Response(json.dumps(listing), mimetype="application/json")
+
+
+def _dataset_response(name):
+    if name not in registry.registered():
+        return _error(404, f"unknown dataset {name!r}")
+    try:
+        fmt = request.args.get("format", "json")
+        if fmt not in ("json", "arrow"):
+            raise QueryError("format must be json or arrow")
+        if fmt == "arrow" and not HAS_PYARROW:
+            return _error(406, "Arrow output needs pyarrow on the server")
+        offset = max(_int_arg("offset", 0), 0)
+        limit = min(max(_int_arg("limit", DEFAULT_LIMIT), 1), MAX_LIMIT)
+        countries, columns = _list_arg("country"), _list_arg("columns")
+        start, end = request.args.get("start"), request.args.get("end")
+
+        registry.get(name)  # the version below must describe loaded data
+        params = (name, tuple(sorted(countries)), start, end, tuple(columns), offset, limit, fmt)
+        etag = '"' + hashlib.sha1(repr((registry.version(name), params)).encode("utf-8")).hexdigest()[:20] + '"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=304, headers={"ETag": etag})
+        cached = response_cache.get(etag)
+        if cached is not None:
+            return Response(cached[1], headers=cached[2])
+
+        df = query(name, countries, start, end, columns)
+    except QueryError as e:
+        return _error(400, str(e))
+    except (OSError, KeyError) as e:
+        return _error(503, f"dataset {name!r} is unavailable: {e}")
+
+    total = len(df)
+    page = df.iloc[offset:offset + limit]
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Total-Count": str(total)}
+    if offset + limit < total:
+        args = request.args.to_dict(flat=False)
+        args["offset"] = [str(offset + limit)]
+        headers["Link"] = f'<{request.path}?{urlencode(args, doseq=True)}>; rel="next"'
+
+    if fmt == "json":
+        headers["Content-Type"] = "application/json"
+        body = _json_body(name, page, total, offset, limit)
+    else:
+        headers["Content-Type"] = ARROW_MIMETYPE
+        if page.memory_usage(deep=False).sum() > CACHE_ITEM_BYTES:
+            # Too big to keep: streamed as it is written
+            return Response(_arrow_stream(page), headers=headers)
+        body = b"".join(_arrow_stream(page))
+    if len(body) <= CACHE_ITEM_BYTES:
+        response_cache.put(etag, name, body, headers)
+    return Response(body, headers=headers)
+
+
+def init_app(server):
+    server.add_url_rule(API_ROUTE, "api_datasets", _list_response, methods=["GET"])
+    server.add_url_rule(API_ROUTE + "/<name>", "api_dataset", _dataset_response, methods=["GET"])
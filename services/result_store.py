@@ -0,0 +1,119 @@
+# result_store.py: server-side keyed storage for frames referenced by dcc.Store
+#
+# Instead of shipping a whole frame to the browser as JSON (and parsing it
+# back on every interaction), a callback puts the frame here and stores only
+# the returned key in its dcc.Store. Later callbacks resolve the key with a
+# dictionary lookup.
+#
+# Keys are content hashes, so every worker process derives the same key for
+# the same frame. Storage is an in-process LRU, optionally backed by a local
+# directory (COVID_EDA_RESULT_DIR) so entries survive eviction and can be
+# shared between workers on one host.
+#
+# A key read back from the browser is untrusted: get() only accepts the exact
+# format key_for() produces, so a forged key can never name (and unpickle) a
+# file outside the store's directory.
+
+import collections
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+
+import pandas as pd
+
+KEY_PATTERN = re.compile(r"^\w+:[0-9a-f]{16}$")
+
+
+class ResultStore:
+    def __init__(self, max_items=32, disk_dir=None):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Keys
+    # --------------------------------------------------
+    @staticmethod
+    def key_for(df, prefix="result"):
+        digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+        digest.update(repr(list(df.columns)).encode("utf-8"))
+        return f"{prefix}:{digest.hexdigest()[:16]}"
+
+    @staticmethod
+    def valid_key(key):
+        return isinstance(key, str) and KEY_PATTERN.fullmatch(key) is not None
+
+    # --------------------------------------------------
+    # In-process LRU
+    # --------------------------------------------------
+    def put(self, df, key=None, prefix="result"):
+        """Store `df` and return the key to keep in the dcc.Store."""
+        key = key or self.key_for(df, prefix)
+        if not self.valid_key(key):
+            raise ValueError(f"invalid result key {key!r}")
+        with self._lock:
+            self._items[key] = df
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        if self.disk_dir:
+            self._write_disk(key, df)
+        return key
+
+    def get(self, key):
+        """Return the frame stored under `key`, or None if it is unknown here."""
+        if not self.valid_key(key):
+            return None
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        if self.disk_dir:
+            df = self._read_disk(key)
+            if df is not None:
+                self.put(df, key=key)
+                return df
+        return None
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    # --------------------------------------------------
+    # Optional local-disk backend
+    # --------------------------------------------------
+    def _disk_path(self, key):
+        root = os.path.realpath(self.disk_dir)
+        path = os.path.realpath(os.path.join(root, key.replace(":", "_") + ".pkl"))
+        if os.path.dirname(path) != root:
+            raise ValueError(f"invalid result key {key!r}")
+        return path
+
+    def _write_disk(self, key, df):
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(self.disk_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(df, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _read_disk(self, key):
+        if not self.valid_key(key):
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as fh:
+                return pickle.load(fh)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+
+
+default_store = ResultStore(disk_dir=os.environ.get("COVID_EDA_RESULT_DIR") or None)
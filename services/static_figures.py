@@ -0,0 +1,132 @@
+# static_figures.py: static figures served as cached, pre-compressed JSON
+#
+# Figures that never change between visits (US macro series, Europe GDP pies
+# and Aids bars) used to be embedded in every layout response and
+# re-serialized each time. Instead, each one is serialized once, hashed and
+# pre-compressed (gzip, plus brotli when the package is installed), and served
+# from FIGURE_ROUTE with an ETag and long-lived cache headers. The layout only
+# carries a small dcc.Store holding the figure's content-hashed URL; a
+# clientside callback fetches it, so repeat page loads are answered from the
+# browser cache or with a 304.
+#
+#     static_figures.register("us.gdp", build_gdp_figure,   # at import
+#                             datasets=["us_gdp"])
+#     static_figures.graph("us.gdp")                        # inside layout()
+#     static_figures.init_app(app.server)                   # once, in app.py
+
+import gzip
+import hashlib
+import threading
+
+import dash
+from dash import dcc, html, Input, Output, MATCH
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FIGURE_ROUTE = "/static-figures/<name>.json"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_BUILDERS = {}  # name -> function returning a plotly figure
+_DEPENDS = {}   # name -> registry datasets the figure is built from
+_BUILT = {}     # name -> {"etag", "identity", "gzip", "br"}
+_LOCK = threading.Lock()
+
+
+def register(name, build, datasets=()):
+    _BUILDERS[name] = build
+    _DEPENDS[name] = set(datasets)
+
+
+def invalidate(name=None):
+    """Forget the serialized figure(s); they are rebuilt on next request."""
+    with _LOCK:
+        if name is None:
+            _BUILT.clear()
+        else:
+            _BUILT.pop(name, None)
+
+
+def invalidate_datasets(names):
+    """Forget the figures built from any of the registry datasets `names`;
+    they get a new content hash, hence a new URL, on the next layout."""
+    for name, datasets in _DEPENDS.items():
+        if datasets & set(names):
+            invalidate(name)
+
+
+def _serialize(name):
+    body = _BUILDERS[name]().to_json().encode("utf-8")
+    entry = {
+        "etag": hashlib.sha256(body).hexdigest()[:20],
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=9),
+        "br": brotli.compress(body, quality=11) if brotli is not None else None,
+    }
+    return entry
+
+
+def get(name):
+    if name not in _BUILT:
+        with _LOCK:
+            if name not in _BUILT:
+                _BUILT[name] = _serialize(name)
+    return _BUILT[name]
+
+
+def url(name):
+    return FIGURE_ROUTE.replace("<name>", name) + "?v=" + get(name)["etag"]
+
+
+def graph(name, **graph_kwargs):
+    """Layout block for a static figure: the URL store and an empty dcc.Graph."""
+    return html.Div([
+        dcc.Store(id={"type": "static-figure-src", "name": name}, data=url(name)),
+        dcc.Graph(id={"type": "static-figure", "name": name}, **graph_kwargs),
+    ])
+
+
+# --------------------------------------------------
+# Browser side: fetch the figure through the HTTP cache
+# --------------------------------------------------
+dash.clientside_callback(
+    """
+    async function(src) {
+        if (!src) { return window.dash_clientside.no_update; }
+        const response = await fetch(src);
+        return await response.json();
+    }
+    """,
+    Output({"type": "static-figure", "name": MATCH}, "figure"),
+    Input({"type": "static-figure-src", "name": MATCH}, "data"),
+)
+
+
+# --------------------------------------------------
+# Server side
+# --------------------------------------------------
+def _response(name):
+    if name not in _BUILDERS:
+        return Response(status=404)
+    entry = get(name)
+    etag = f'"{entry["etag"]}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status=304, headers=headers)
+
+    accepted = request.headers.get("Accept-Encoding", "")
+    if entry["br"] is not None and "br" in accepted:
+        body, headers["Content-Encoding"] = entry["br"], "br"
+    elif "gzip" in accepted:
+        body, headers["Content-Encoding"] = entry["gzip"], "gzip"
+    else:
+        body = entry["identity"]
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+def init_app(server):
+    server.add_url_rule(FIGURE_ROUTE, "static_figure", _response)
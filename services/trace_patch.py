@@ -0,0 +1,134 @@
+# trace_patch.py: multi-select line charts updated by trace diffs (dash.Patch)
+#
+# Adding one country to a chart used to rebuild and resend the whole figure,
+# every existing trace included. A TraceSet instead remembers, in a dcc.Store
+# next to the graph, which items are drawn, in which order and color. On a
+# selection change it answers with a Patch that deletes the traces of the
+# removed items and appends those of the added ones, so the response grows
+# with the change, not with the selection. The first render (and a page
+# reload) still sends the full figure.
+#
+# Each item's trace is built once by `build_trace(item)` (a plotly trace, or
+# None when the item has no data) and kept as plain JSON until a data
+# refresh replaces one of `datasets`.
+#
+#     gdp = TraceSet("global.gdp", build_gdp_trace, layout={...}, datasets=["world_indicators"])
+#     gdp.connect("country-dropdown-gdp-global", "gdp-graph-global")   # at import
+#     ..., dcc.Graph(id="gdp-graph-global"), gdp.store("gdp-graph-global")  # in layout
+
+import json
+import threading
+
+import dash
+import plotly.express as px
+import plotly.graph_objects as go
+from dash import dcc, Input, Output, Patch, State
+
+import datasets
+
+PALETTE = px.colors.qualitative.Plotly  # colorway of the default template
+
+
+class TraceSet:
+    def __init__(self, name, build_trace, layout, datasets=()):
+        self.name = name
+        self.build_trace = build_trace
+        self.layout = layout
+        self.datasets = set(datasets)
+        self.hits = 0
+        self.misses = 0
+        self._traces = {}  # item -> trace JSON (no color), or None
+        self._generation = 0  # bumped by invalidate(): in-flight builds are not stored
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------
+    # Per-item traces
+    # ------------------------------------------------
+    def trace(self, item):
+        with self._lock:
+            if item in self._traces:
+                self.hits += 1
+                return self._traces[item]
+            self.misses += 1
+            generation = self._generation
+        built = self.build_trace(item)
+        # Plain JSON (numeric arrays stay binary-encoded): safe to share between requests
+        trace = json.loads(go.Figure([built]).to_json())["data"][0] if built is not None else None
+        with self._lock:
+            if generation == self._generation:  # else built from data replaced meanwhile
+                self._traces[item] = trace
+        return trace
+
+    def invalidate(self, names=None):
+        if names is None or self.datasets & set(names):
+            with self._lock:
+                self._generation += 1
+                self._traces.clear()
+
+    @staticmethod
+    def _colored(trace, color):
+        return {**trace, "line": {**trace.get("line", {}), "color": color}}
+
+    # ------------------------------------------------
+    # Full figure and diffs
+    # ------------------------------------------------
+    def figure(self, selection):
+        """Full figure for `selection`, and the drawn items [[item, color], ...]."""
+        drawn, data = [], []
+        for item in selection:
+            trace = self.trace(item)
+            if trace is not None:
+                color = PALETTE[len(drawn) % len(PALETTE)]
+                drawn.append([item, color])
+                data.append(self._colored(trace, color))
+        layout = {"template": go.Figure().to_plotly_json()["layout"]["template"], **self.layout}
+        return {"data": data, "layout": layout}, drawn
+
+    def update(self, selection, drawn):
+        """(figure or Patch, drawn items) taking the chart from `drawn` to `selection`."""
+        selection = list(dict.fromkeys(selection or []))
+        if drawn is None:
+            return self.figure(selection)
+
+        wanted = set(selection)
+        kept = [entry for entry in drawn if entry[0] in wanted]
+        removed = [i for i, entry in enumerate(drawn) if entry[0] not in wanted]
+        present = {entry[0] for entry in drawn}
+        added = [item for item in selection if item not in present]
+        if not removed and not added:
+            return dash.no_update, dash.no_update
+
+        patch = Patch()
+        for i in reversed(removed):  # from the end, so earlier indices stay valid
+            del patch["data"][i]
+        used = {color for _, color in kept}
+        free = [color for color in PALETTE if color not in used]
+        for item in added:
+            trace = self.trace(item)
+            if trace is None:
+                continue
+            color = free.pop(0) if free else PALETTE[len(kept) % len(PALETTE)]
+            kept.append([item, color])
+            patch["data"].append(self._colored(trace, color))
+        return patch, kept
+
+    # ------------------------------------------------
+    # Dash wiring
+    # ------------------------------------------------
+    @staticmethod
+    def store(graph_id):
+        return dcc.Store(id=f"{graph_id}-traces")
+
+    def connect(self, dropdown_id, graph_id):
+        datasets.subscribe(self.invalidate)
+
+        def update_traces(selection, drawn):
+            return self.update(selection, drawn)
+
+        update_traces.__name__ = f"update_{self.name.replace('.', '_')}"
+        return dash.callback(
+            Output(graph_id, "figure"),
+            Output(f"{graph_id}-traces", "data"),
+            Input(dropdown_id, "value"),
+            State(f"{graph_id}-traces", "data"),
+        )(update_traces)
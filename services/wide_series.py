@@ -0,0 +1,158 @@
+# wide_series.py: one engine for "pick countries, plot their columns" charts
+#
+# Eurostat exports are wide: a time column followed by one column per
+# country. Each indicator is held once as a pre-typed float64 matrix, and a
+# chart is built by slicing only the selected columns into go.Scatter traces;
+# the full frame never goes through plotly.express per request.
+#
+# Pages declare their indicators in a spec table (list of dicts):
+#     key           unique id, used in the component ids
+#     dataset       registry name of the wide table
+#     heading       H3 above the dropdown, or None
+#     label         figure title prefix ("GDP of [...] Over Time")
+#     yaxis_title   y axis title
+#     options       optional function(columns) -> dropdown choices
+# then call section(spec) in their layout and register_callback(...) once:
+# a single pattern-matching callback serves every indicator.
+
+import threading
+
+import dash
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from dash import dcc, html, Input, Output, MATCH
+
+import datasets
+from services.figure_cache import figure_cache, normalize_selection
+
+DROPDOWN_TYPE = "wide-series-dropdown"
+GRAPH_TYPE = "wide-series-graph"
+
+
+class WideTable:
+    def __init__(self, time, columns, matrix, time_name):
+        self.time = time
+        self.columns = columns
+        self.matrix = matrix
+        self.time_name = time_name
+        self._position = {col: i for i, col in enumerate(columns)}
+
+    @classmethod
+    def from_frame(cls, df):
+        value_cols = df.columns[1:]
+        values = df[value_cols]
+        # The schema layer already types the columns; only stray text columns are coerced
+        text_cols = [col for col in value_cols if not pd.api.types.is_numeric_dtype(values[col])]
+        if text_cols:
+            values = values.assign(**{col: pd.to_numeric(values[col], errors="coerce") for col in text_cols})
+        return cls(
+            time=df.iloc[:, 0].to_numpy(),
+            columns=list(value_cols),
+            matrix=np.ascontiguousarray(values.to_numpy(dtype="float64")),
+            time_name=df.columns[0],
+        )
+
+    def select(self, selection):
+        """(column, values) pairs for the selected columns, in selection order."""
+        if selection is None:
+            return []
+        if isinstance(selection, str):
+            selection = [selection]
+        return [
+            (col, self.matrix[:, self._position[col]])
+            for col in selection if col in self._position
+        ]
+
+
+# --------------------------------------------------
+# Loaded tables
+# --------------------------------------------------
+_TABLES = {}
+_SPECS = {}
+_LOCK = threading.Lock()
+
+
+def table(name):
+    if name not in _TABLES:
+        with _LOCK:
+            if name not in _TABLES:
+                _TABLES[name] = WideTable.from_frame(datasets.get(name))
+    return _TABLES[name]
+
+
+def invalidate(name=None):
+    with _LOCK:
+        if name is None:
+            _TABLES.clear()
+        else:
+            _TABLES.pop(name, None)
+
+
+def _on_refresh(names):
+    for name in names:
+        invalidate(name)
+
+
+datasets.subscribe(_on_refresh)
+
+
+# --------------------------------------------------
+# Figures
+# --------------------------------------------------
+@figure_cache.memoize("wide_series")
+def build_figure(selection, key):
+    spec = _SPECS[key]
+    wide = table(spec["dataset"])
+    traces = wide.select(selection)
+    fig = go.Figure([
+        go.Scatter(x=wide.time, y=values, name=col, mode="lines")
+        for col, values in traces
+    ])
+    fig.update_layout(
+        # The entry is shared by every order of the selection, so is its title
+        title=f"{spec['label']} of {normalize_selection(selection)} Over Time",
+        xaxis_title=wide.time_name,
+        yaxis_title=spec["yaxis_title"],
+        showlegend=len(traces) > 1,
+        legend_title_text="variable",
+    )
+    return fig
+
+
+# --------------------------------------------------
+# Layout and callback
+# --------------------------------------------------
+def section(spec):
+    choices = table(spec["dataset"]).columns
+    if spec.get("options"):
+        choices = spec["options"](choices)
+    children = [html.H3(spec["heading"])] if spec.get("heading") else []
+    children += [
+        dcc.Dropdown(
+            id={"type": DROPDOWN_TYPE, "indicator": spec["key"]},
+            options=[{"label": c, "value": c} for c in choices],
+            value=choices[0],
+            multi=True,
+        ),
+        dcc.Graph(id={"type": GRAPH_TYPE, "indicator": spec["key"]}),
+    ]
+    return html.Div(children)
+
+
+def register_callback(specs):
+    """Register the specs and the single MATCH callback that serves them all."""
+    first_time = not _SPECS
+    for spec in specs:
+        _SPECS[spec["key"]] = spec
+    figure_cache.depend("wide_series", [spec["dataset"] for spec in specs])
+    if not first_time:
+        return
+
+    @dash.callback(
+        Output({"type": GRAPH_TYPE, "indicator": MATCH}, "figure"),
+        Input({"type": DROPDOWN_TYPE, "indicator": MATCH}, "value"),
+    )
+    def update_wide_series(selection):
+        key = dash.ctx.outputs_list["id"]["indicator"]
+        return build_figure(selection, key)
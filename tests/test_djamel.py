@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasets import djamel, registry
+
+
+def _monthly(code, group, stringency, rates, start="2020-01"):
+    """One country's ETL rows: a stringency per month, an unemployment rate per year."""
+    months = pd.period_range(start, periods=len(stringency), freq="M")
+    years = months.year.to_numpy()
+    return pd.DataFrame({
+        "CountryCode": code,
+        "CountryName": code,
+        "IncomeGroup_Custom": group,
+        "Year_Month": months.astype(str),
+        "Year": years,
+        "Stringency_Index": stringency,
+        "Unemployment_Rate": [rates[year] for year in years],
+        "Unemployment_Change": [rates[year] - rates[2019] for year in years],
+    })
+
+
+def test_lag_moves_the_unemployment_year():
+    df = _monthly("FRA", "1 - Haut Revenu", [10.0] * 12 + [20.0] * 12,
+                  {2019: 7.0, 2020: 8.0, 2021: 9.0})
+    same = djamel._lagged_pairs(df, 0)
+    assert same["y"].tolist() == [8.0] * 12 + [9.0] * 12
+    # Six months on: July 2020 already meets 2021's rate; late 2021 has no pair
+    half = djamel._lagged_pairs(df, 6)
+    assert half["y"].tolist() == [8.0] * 6 + [9.0] * 12
+    assert djamel._lagged_pairs(df, 12)["y"].tolist() == [9.0] * 12
+
+
+def test_fit_of_an_exact_line():
+    pairs = pd.DataFrame({"g": ["a"] * 4 + ["b"] * 4,
+                          "x": [1.0, 2, 3, 4] + [5.0] * 4,
+                          "y": [3.0, 5, 7, 9] + [1.0, 2, 3, 4]})
+    fit = djamel._fit(pairs, "g")
+    assert fit.loc["a", "n"] == 4
+    assert fit.loc["a", "corr"] == pytest.approx(1.0)
+    assert fit.loc["a", "slope"] == pytest.approx(2.0)
+    # Constant stringency: no slope, no correlation
+    assert np.isnan(fit.loc["b", "slope"]) and np.isnan(fit.loc["b", "corr"])
+
+
+def test_policy_correlation_per_country(monkeypatch):
+    rates = {2019: 5.0, 2020: 6.0, 2021: 8.0, 2022: 7.0}
+    df = pd.concat([
+        _monthly("FRA", "1 - Haut Revenu", np.linspace(10, 80, 36), rates),
+        _monthly("ETH", "3 - Faible Revenu", np.linspace(10, 80, 6), rates),
+    ], ignore_index=True)
+    monkeypatch.setattr(registry, "get", lambda name: df)
+    out = djamel.build_policy_correlation().set_index("CountryCode")
+    assert out.loc["FRA", "n_lag0"] == 36 and out.loc["FRA", "n_lag12"] == 24
+    assert out.loc["FRA", "Unemployment_Change_Peak"] == 3.0
+    assert out.loc["FRA", "Stringency_Peak"] == 80
+    # Fewer than MIN_POINTS months: counted, but no correlation
+    assert out.loc["ETH", "n_lag0"] == 6
+    assert np.isnan(out.loc["ETH", "corr_lag0"]) and np.isnan(out.loc["ETH", "slope_lag0"])
+
+    groups = djamel.build_income_correlation().set_index("IncomeGroup_Custom")
+    assert groups.loc["1 - Haut Revenu", "Countries"] == 1
+    assert groups.loc["3 - Faible Revenu", "n_lag0"] == 6
+
+
+def test_income_groups_from_the_shipped_classification(monkeypatch):
+    shipped = pd.DataFrame({"Country Code": ["ETH", "NAM"],
+                            "IncomeGroup": ["Low income", "Lower middle income"]})
+    meta = pd.DataFrame({"Country Code": ["NAM", "VEN"], "IncomeGroup": ["Upper middle income", "nan"]})
+
+    def get(name):
+        if name == djamel.INCOME_GROUPS:
+            return shipped
+        if name == djamel.COUNTRY_META and meta is not None:
+            return meta
+        raise OSError(name)
+
+    monkeypatch.setattr(registry, "get", get)
+    groups = djamel._income_groups()
+    assert groups["NAM"] == "2 - Émergent (Interm. Sup.)"  # the metadata file wins
+    assert groups["ETH"] == "3 - Faible Revenu"
+    assert groups["FRA"] == "1 - Haut Revenu"  # from the default country list
+    assert "VEN" not in groups
+    meta = None
+    assert djamel._income_groups()["NAM"] == "2 - Émergent (Interm. Inf.)"
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from services import downsample
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    x = np.arange(1000)
+    y = np.sin(x / 20.0)
+    keep = downsample.lttb_indices(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(1000)
+    y[537] = 50.0
+    keep = downsample.lttb_indices(np.arange(1000), y, 50)
+    assert 537 in keep
+
+
+def test_short_series_is_untouched():
+    assert list(downsample.lttb_indices(np.arange(10), np.arange(10), 100)) == list(range(10))
+    assert list(downsample.minmax_indices(np.arange(10.0), 100)) == list(range(10))
+
+
+def test_minmax_keeps_extremes():
+    y = np.random.default_rng(0).normal(size=1000)
+    keep = downsample.minmax_indices(y, 100)
+    assert y.argmin() in keep and y.argmax() in keep
+
+
+def test_downsample_per_group():
+    dates = pd.date_range("2020-01-01", periods=2000, freq="D")
+    df = pd.DataFrame({
+        "date": np.tile(dates, 2),
+        "country": np.repeat(["A", "B"], 2000),
+        "value": np.arange(4000.0),
+    })
+    out = downsample.downsample(df, "date", "value", budget=100, group="country")
+    assert out.groupby("country").size().tolist() == [100, 100]
+
+
+def test_x_range_from_relayout():
+    assert downsample.x_range_from_relayout(None) is None
+    assert downsample.x_range_from_relayout({"xaxis.autorange": True}) is None
+    assert downsample.x_range_from_relayout(
+        {"xaxis.range[0]": "2020-01-01", "xaxis.range[1]": "2020-06-01"}
+    ) == ("2020-01-01", "2020-06-01")
+    assert downsample.x_range_from_relayout({"xaxis.range": ["2020-01-01", "2020-06-01"]}) == (
+        "2020-01-01", "2020-06-01")
+
+
+def test_x_range_with_one_end():
+    assert downsample.x_range_from_relayout({"xaxis.range[1]": "2020-06-01"}) == (None, "2020-06-01")
+    assert downsample.x_range_from_relayout({"xaxis.range[0]": "2020-01-01"}) == ("2020-01-01", None)
+
+
+def test_window_with_open_end():
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=100, freq="D")})
+    out = downsample.window(df, "date", (None, "2020-01-10"), margin=0)
+    assert out["date"].min() == pd.Timestamp("2020-01-01")
+    assert out["date"].max() == pd.Timestamp("2020-01-10")
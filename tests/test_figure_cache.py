@@ -0,0 +1,92 @@
+from services.figure_cache import FigureCache
+
+
+def _builder(cache, calls, **options):
+    @cache.memoize("test", **options)
+    def build(selection, x_range=None):
+        calls.append(list(selection))
+        return {"data": [{"name": item} for item in selection], "layout": {}}
+    return build
+
+
+def test_selection_order_is_kept_and_shared():
+    cache, calls = FigureCache(), []
+    build = _builder(cache, calls)
+    first = build(["India", "France"])
+    second = build(["France", "India"])
+    assert calls == [["India", "France"]]  # one build for both orders
+    assert [t["name"] for t in first["data"]] == ["India", "France"]
+    assert [t["name"] for t in second["data"]] == ["France", "India"]
+    # The cached figure itself is not reordered
+    assert [t["name"] for t in build(["India", "France"])["data"]] == ["India", "France"]
+
+
+def test_least_recently_used_is_evicted():
+    cache, calls = FigureCache(max_items=2), []
+    build = _builder(cache, calls)
+    build(["A"])
+    build(["B"])
+    build(["A"])  # hit: B is now the oldest
+    build(["C"])
+    assert cache.stats()["evictions"] == 1
+    build(["A"])
+    build(["B"])
+    assert calls == [["A"], ["B"], ["C"], ["B"]]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_refresh_drops_only_dependent_callbacks():
+    cache = FigureCache()
+    health, indicators = [], []
+
+    @cache.memoize("health", datasets=["world_health"])
+    def build_health(selection):
+        health.append(selection)
+        return {"data": [], "layout": {}}
+
+    @cache.memoize("gdp", datasets=["world_indicators"])
+    def build_gdp(selection):
+        indicators.append(selection)
+        return {"data": [], "layout": {}}
+
+    build_health(["A"])
+    build_gdp(["A"])
+    cache.invalidate_datasets(["world_health"])
+    build_health(["A"])
+    build_gdp(["A"])
+    assert len(health) == 2 and len(indicators) == 1
+
+
+def test_build_overlapping_a_refresh_is_not_kept():
+    cache, calls = FigureCache(), []
+
+    @cache.memoize("test")
+    def build(selection):
+        calls.append(selection)
+        if len(calls) == 1:
+            cache.invalidate()  # the data is replaced while the first build runs
+        return {"data": [], "layout": {}}
+
+    build(["A"])
+    build(["A"])
+    assert len(calls) == 2
+
+def test_zoomed_figures_do_not_evict_the_others():
+    cache, calls = FigureCache(max_items=2, zoom_items=2), []
+    build = _builder(cache, calls, x_range_arg=1)
+    build(["A"])
+    for day in range(1, 10):
+        build(["A"], ("2020-01-01", f"2020-02-{day:02d}"))
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["zoom_size"] == 2
+    build(["A"])
+    assert len(calls) == 10  # the unzoomed figure was still cached
+
+
+def test_invalidate_reaches_zoomed_entries():
+    cache, calls = FigureCache(), []
+    cache.depend("test", ["world_health"])
+    build = _builder(cache, calls, x_range_arg=1)
+    build(["A"], ("2020-01-01", "2020-02-01"))
+    cache.invalidate_datasets(["world_health"])
+    assert cache.stats()["zoom_size"] == 0
@@ -0,0 +1,18 @@
+import pytest
+
+from services import jobs
+
+
+def test_job_id_format():
+    assert jobs.valid_job_id(jobs.job_id_for("etl", (1,)))
+
+
+@pytest.mark.parametrize("job_id", ["../../etc/passwd", "abc", None, "0123456789ABCDEF"])
+def test_invalid_job_ids_are_unknown(job_id):
+    assert jobs.status(job_id)["state"] == "unknown"
+
+
+def test_completed_is_readable(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_DIR", str(tmp_path))
+    job_id = jobs.completed("etl", {"key": "x"})
+    assert jobs.status(job_id)["result"] == {"key": "x"}
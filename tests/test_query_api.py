@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import query_api
+
+
+@pytest.fixture
+def health(monkeypatch):
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2020-02-29", "2020-03-01", "2020-03-31", "2020-04-01"]),
+        "country": ["France", "France", "Japan", "Japan"],
+        "cases": np.array([1.1, 2.7, 3090.23, 4.0], dtype="float32"),
+    })
+    monkeypatch.setattr(query_api.registry, "get", lambda name: df.copy())
+    return df
+
+
+def test_month_bounds_include_both_ends(health):
+    out = query_api.query("test", start="2020-03", end="2020-03")
+    assert out["date"].dt.strftime("%Y-%m-%d").tolist() == ["2020-03-01", "2020-03-31"]
+
+
+def test_country_filter(health):
+    assert query_api.query("test", countries={"Japan"})["country"].tolist() == ["Japan", "Japan"]
+
+
+def test_bad_inputs(health):
+    with pytest.raises(query_api.QueryError):
+        query_api.query("test", start="not a date")
+    with pytest.raises(query_api.QueryError):
+        query_api.query("test", columns=["missing"])
+
+
+def test_year_columns_of_wide_tables(monkeypatch):
+    wide = pd.DataFrame({"Country Name": ["France"], "2019": [1.0], "2020": [2.0], "2021": [3.0]})
+    monkeypatch.setattr(query_api.registry, "get", lambda name: wide.copy())
+    assert list(query_api.query("test", start="2020", end="2020").columns) == ["Country Name", "2020"]
+
+
+def test_json_has_no_float32_noise(health):
+    body = query_api._json_body("test", health, len(health), 0, 10).decode("utf-8")
+    assert '"cases":2.7}' in body and '"cases":3090.23}' in body
+    assert "2.700000" not in body and "3090.229" not in body
@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pytest
+
+from datasets import columnar_cache, registry
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    """A raw CSV dataset and a table derived from it, removed afterwards."""
+    monkeypatch.setattr(columnar_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "values.csv"
+    path.write_text("country,value\nFrance,1\nJapan,2\n")
+    registry.register("test_values", str(path))
+    registry.derive(
+        "test_total",
+        lambda: pd.DataFrame({"total": [registry.get("test_values")["value"].sum()]}),
+        depends_on=["test_values"],
+    )
+    yield path
+    for name in ("test_values", "test_total"):
+        for table in (registry._SOURCES, registry._FRAMES, registry._STAMPS, registry._STATS):
+            table.pop(name, None)
+
+
+def _edit(path, text):
+    st = os.stat(path)
+    path.write_text(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_stale_after_edit(sources):
+    assert registry.get("test_total")["total"].iloc[0] == 3
+    assert "test_values" not in registry.stale_sources()
+    _edit(sources, "country,value\nFrance,1\nJapan,2\nPeru,4\n")
+    assert registry.stale_sources() == ["test_values"]
+
+
+def test_refresh_rebuilds_dependents(sources):
+    registry.get("test_total")
+    _edit(sources, "country,value\nFrance,10\n")
+    notified = []
+    registry.subscribe(notified.append)
+    try:
+        replaced = registry.refresh(["test_values"])
+    finally:
+        registry._LISTENERS.remove(notified.append)
+    assert replaced == ["test_values", "test_total"]
+    assert notified == [{"test_values", "test_total"}]
+    assert registry.get("test_total")["total"].iloc[0] == 10
+    assert "test_values" not in registry.stale_sources()
+
+
+def test_installed_table_tracks_its_inputs(sources):
+    stamps = registry.input_stamps("test_total")
+    registry.install("test_total", pd.DataFrame({"total": [3]}), stamps)
+    assert not registry.loaded("test_values")
+    _edit(sources, "country,value\nFrance,5\n")
+    assert registry.stale_sources() == ["test_values"]
+    registry.refresh(registry.stale_sources())
+    assert registry.get("test_total")["total"].iloc[0] == 5
+
+
+def test_stamp_is_the_snapshot_not_the_live_file(sources):
+    registry.get("test_values")
+    before = registry.stamp("test_values")
+    _edit(sources, "country,value\nFrance,7\n")
+    assert registry.stamp("test_values") == before
+    registry.refresh(["test_values"])
+    assert registry.stamp("test_values") != before
+
+
+
+def test_info_does_not_load(sources):
+    info = registry.info("test_total")
+    assert info["kind"] == "derived" and info["depends_on"] == ["test_values"]
+    assert not info["loaded"] and not registry.loaded("test_values")
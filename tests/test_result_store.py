@@ -0,0 +1,32 @@
+import os
+import pickle
+
+import pandas as pd
+import pytest
+
+from services.result_store import ResultStore
+
+
+def test_round_trip_through_disk(tmp_path):
+    store = ResultStore(disk_dir=str(tmp_path))
+    key = store.put(pd.DataFrame({"a": [1, 2]}), prefix="djamel")
+    assert ResultStore.valid_key(key)
+    store.clear()
+    assert store.get(key)["a"].tolist() == [1, 2]
+
+
+@pytest.mark.parametrize("key", [
+    "../evil", "djamel:../../evil", "djamel:0123456789abcdef/..", "djamel:0123", None, 42,
+])
+def test_forged_keys_are_rejected(tmp_path, key):
+    with open(tmp_path / "evil.pkl", "wb") as fh:
+        pickle.dump("unpickled", fh)
+    store = ResultStore(disk_dir=str(tmp_path / "store"))
+    assert store.get(key) is None
+
+
+def test_put_rejects_a_forged_key(tmp_path):
+    store = ResultStore(disk_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        store.put(pd.DataFrame(), key="../x")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from datasets import schema
+
+
+def test_compact_narrows_floats_that_survive():
+    df = pd.DataFrame({"rate": [2.7, 3.1, np.nan], "count": [103436829.0, 1.0, 2.0]})
+    out = schema.compact(df)
+    assert out["rate"].dtype == "float32"
+    # float32 would round this count: it stays float64
+    assert out["count"].dtype == "float64"
+
+
+def test_compact_integers_categoricals_and_years():
+    df = pd.DataFrame({
+        "country": ["France", "Japan"],
+        "n": [1, 200],
+        "1999": [1.0, 2.0],
+        "2020": [1.0, 2.0],
+        "Unnamed: 4": [np.nan, np.nan],
+    })
+    out = schema.compact(df, categorical=["country"], years=(2000, None))
+    assert list(out.columns) == ["country", "n", "2020"]
+    assert isinstance(out["country"].dtype, pd.CategoricalDtype)
+    assert out["n"].dtype == "int16"
+
+
+
+def test_widen_removes_float32_noise():
+    narrow = np.array([2.7, 3090.23, np.nan, 1e6], dtype="float32")
+    wide = schema.widen(narrow)
+    assert wide.dtype == "float64"
+    assert wide[0] == 2.7 and wide[1] == 3090.23 and wide[3] == 1e6
+    assert np.isnan(wide[2])
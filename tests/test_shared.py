@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasets import shared
+
+pytestmark = pytest.mark.skipif(not shared.HAS_PYARROW, reason="needs pyarrow")
+
+
+def test_attach_round_trip_is_zero_copy(tmp_path):
+    df = pd.DataFrame(
+        {"cases": np.arange(4.0), "deaths": np.arange(4), "name": list("abcd")},
+        index=pd.MultiIndex.from_arrays(
+            [["FRA", "FRA", "JPN", "JPN"], pd.date_range("2020-01-01", periods=4)],
+            names=["CountryCode", "Date"],
+        ),
+    )
+    shared.export("test", df, str(tmp_path))
+    attached = shared.attach("test", str(tmp_path))
+    assert attached.equals(df)
+    assert shared.is_zero_copy(attached)
+
+
+def test_ordinary_frames_are_not_zero_copy(tmp_path):
+    assert not shared.is_zero_copy(pd.DataFrame({"a": [1.0, 2.0]}))
+    shared.export("test", pd.DataFrame({"a": [1.0, 2.0]}), str(tmp_path))
+    attached = shared.attach("test", str(tmp_path))
+    assert not shared.is_zero_copy(attached.copy())
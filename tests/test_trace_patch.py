@@ -0,0 +1,75 @@
+import dash
+import plotly.graph_objects as go
+
+from services.trace_patch import PALETTE, TraceSet
+
+
+def _traces():
+    built = []
+
+    def build(country):
+        built.append(country)
+        if country == "Nowhere":
+            return None
+        return go.Scatter(x=[2019, 2020], y=[1.0, 2.0], name=country)
+
+    return TraceSet("test", build, layout={"title": {"text": "t"}}), built
+
+
+def _operations(patch):
+    return patch.to_plotly_json()["operations"]
+
+
+def test_first_render_is_a_full_figure():
+    traces, _ = _traces()
+    figure, drawn = traces.update(["France", "Nowhere", "Japan"], None)
+    assert [t["name"] for t in figure["data"]] == ["France", "Japan"]
+    assert drawn == [["France", PALETTE[0]], ["Japan", PALETTE[1]]]
+
+
+def test_unchanged_selection_sends_nothing():
+    traces, _ = _traces()
+    _, drawn = traces.update(["France"], None)
+    assert traces.update(["France"], drawn) == (dash.no_update, dash.no_update)
+
+
+def test_add_and_remove_are_a_patch():
+    traces, built = _traces()
+    _, drawn = traces.update(["France", "Japan", "Peru"], None)
+    patch, drawn = traces.update(["Peru", "Chile"], drawn)
+    ops = _operations(patch)
+    # Removals first, from the last index, then one append
+    assert [(op["operation"], op["location"]) for op in ops] == [
+        ("Delete", ["data", 1]), ("Delete", ["data", 0]), ("Append", ["data"]),
+    ]
+    assert ops[2]["params"]["value"]["name"] == "Chile"
+    # Peru keeps its color; Chile takes the first free one
+    assert drawn == [["Peru", PALETTE[2]], ["Chile", PALETTE[0]]]
+    assert built.count("Peru") == 1  # traces are built once
+
+
+def test_invalidate_rebuilds_on_refresh():
+    traces, built = _traces()
+    traces.datasets = {"world_indicators"}
+    traces.update(["France"], None)
+    traces.invalidate({"world_health"})
+    traces.update(["France"], None)
+    traces.invalidate({"world_indicators"})
+    traces.update(["France"], None)
+    assert built == ["France", "France"]
+
+
+def test_build_overlapping_a_refresh_is_not_kept():
+    built = []
+
+    def build(country):
+        built.append(country)
+        if len(built) == 1:
+            traces.invalidate()  # the data is replaced while the first build runs
+        return go.Scatter(x=[2019], y=[1.0], name=country)
+
+    traces = TraceSet("test", build, layout={})
+    traces.trace("France")
+    traces.trace("France")
+    assert built == ["France", "France"]
+    assert (traces.hits, traces.misses) == (0, 2)
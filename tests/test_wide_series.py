@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from services import wide_series
+
+
+@pytest.fixture
+def spec():
+    frame = pd.DataFrame({"year": [2019, 2020], "France": [1.0, 2.0], "India": [3.0, 4.0]})
+    spec = {"key": "test_wide", "dataset": "test_wide", "label": "GDP", "yaxis_title": "GDP"}
+    wide_series._TABLES["test_wide"] = wide_series.WideTable.from_frame(frame)
+    wide_series._SPECS["test_wide"] = spec
+    yield spec
+    wide_series._TABLES.pop("test_wide", None)
+    wide_series._SPECS.pop("test_wide", None)
+
+
+def test_traces_follow_the_selection(spec):
+    fig = wide_series.build_figure(["India", "France"], "test_wide")
+    assert [t["name"] for t in fig["data"]] == ["India", "France"]
+
+
+def test_title_is_the_same_for_every_order(spec):
+    first = wide_series.build_figure(["India", "France"], "test_wide")
+    second = wide_series.build_figure(["France", "India"], "test_wide")
+    assert [t["name"] for t in second["data"]] == ["France", "India"]
+    assert first["layout"]["title"] == second["layout"]["title"]
+    assert "['France', 'India']" in second["layout"]["title"]["text"]
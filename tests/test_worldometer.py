@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasets import columnar_cache, registry, worldometer
+
+pytestmark = pytest.mark.skipif(not columnar_cache.HAS_PYARROW, reason="needs pyarrow")
+
+CSV = """Date, Country ,Cumulative_Total_Cases,Daily_New_Cases,Active_Cases,Cumulative_Total_Deaths,Daily_New_Deaths
+2020-03-02,France,10,10,10,0,0
+2020-03-01,Bosnia/Herzegovina,1,1,1,0,0
+2020-03-01,France,0,0,0,0,0
+2020-03-03,France,30,20,25,1,1
+2020-03-02,Bosnia/Herzegovina,2,1,2,0,
+2020-03-04,France,60,30,50,1,0
+2020-03-03,Bosnia/Herzegovina,103436829,103436827,2,0,0
+"""
+
+
+@pytest.fixture
+def daily_file(tmp_path, monkeypatch):
+    """A small daily file ingested in chunks of two rows into a temporary cache."""
+    monkeypatch.setattr(columnar_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(worldometer, "CHUNK_ROWS", 2)
+    monkeypatch.setattr(worldometer, "_population", lambda: pd.Series({"France": 2e6}))
+    monkeypatch.setattr(registry, "stamp", lambda name, served=False: (1, 1))
+    path = tmp_path / "daily.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+def test_ingest_writes_one_partition_per_country(daily_file):
+    folder = worldometer.ingest(daily_file)
+    assert worldometer._partitions(folder) == ["Bosnia/Herzegovina", "France"]
+    assert os.listdir(os.path.join(folder, "France")) == ["data.parquet"]
+    # Rows from every chunk, in date order
+    france = worldometer._read_partition(folder, "France")
+    assert france["daily_new_cases"].tolist() == [0, 10, 20, 30]
+    assert list(france.columns) == ["date", "country", *worldometer.METRICS]
+    # A second call finds the folder instead of ingesting again
+    assert worldometer.ingest(daily_file) == folder
+
+
+def test_ingest_keeps_large_counts_exact(daily_file):
+    folder = worldometer.ingest(daily_file)
+    bosnia = worldometer._read_partition(folder, "Bosnia/Herzegovina")
+    assert bosnia["cumulative_total_cases"].dtype == "float64"
+    assert bosnia["cumulative_total_cases"].iloc[-1] == 103436829
+    assert bosnia["active_cases"].dtype == "float32"
+    assert np.isnan(bosnia["daily_new_deaths"].iloc[1])
+
+
+def test_a_new_file_version_replaces_the_old_partitions(daily_file, monkeypatch):
+    old = worldometer.ingest(daily_file)
+    monkeypatch.setattr(registry, "stamp", lambda name, served=False: (2, 2))
+    new = worldometer.ingest(daily_file)
+    assert new != old and os.path.isdir(new) and not os.path.exists(old)
+
+
+def test_add_metrics():
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-03-01", periods=4).repeat(2),
+        "country": ["France", "Peru"] * 4,
+        "cumulative_total_cases": [10.0, 0, 20, 0, 40, 0, 80, 0],
+        "daily_new_cases": [10.0, 0, 10, 0, 20, 0, 40, 0],
+        "active_cases": [10.0, 0, 20, 0, 30, 0, 40, 0],
+        "cumulative_total_deaths": [0.0] * 8,
+        "daily_new_deaths": [0.0, 1, 0, 1, 0, 1, 0, 1],
+    })
+    out = worldometer.add_metrics(df, pd.Series({"France": 1e6}))
+    france = out[out["country"] == "France"]
+    assert np.allclose(france["daily_new_cases_7d"], [10, 10, 40 / 3, 20])
+    # The running total doubles every day: 100 %/day, doubling time one day
+    assert np.isnan(france["cases_growth_rate"].iloc[0])
+    assert france["cases_growth_rate"].iloc[1:].tolist() == [100, 100, 100]
+    assert np.allclose(france["cases_doubling_time"].iloc[1:], 1.0)
+    assert france["active_cases_per_million"].tolist() == [10, 20, 30, 40]
+    # Rolling windows don't cross countries; no population, no per-million value
+    peru = out[out["country"] == "Peru"]
+    assert peru["daily_new_deaths_7d"].tolist() == [1, 1, 1, 1]
+    assert peru["daily_new_cases_per_million"].isna().all()
+    assert (out[worldometer.DERIVED_METRICS].dtypes == "float32").all()
+
+
+def _daily(dates, cases):
+    n = len(dates)
+    df = pd.DataFrame({"date": pd.to_datetime(dates), "country": ["France"] * n})
+    for metric in worldometer.METRICS:
+        df[metric] = np.nan
+    df["daily_new_cases"] = cases
+    df["cumulative_total_cases"] = np.nancumsum(cases)
+    return df
+
+
+def test_weekly_rollup_starts_on_monday():
+    # Sunday 2020-03-01 closes a week; Monday 2020-03-02 opens the next
+    df = _daily(["2020-03-01", "2020-03-02", "2020-03-08"], [5.0, 1.0, 2.0])
+    table = worldometer._aggregate(df, "weekly")
+    weeks = table.loc["France"]
+    assert weeks.index.strftime("%Y-%m-%d").tolist() == ["2020-02-24", "2020-03-02"]
+    assert weeks["daily_new_cases_sum"].tolist() == [5, 3]
+    assert weeks["daily_new_cases_mean"].tolist() == [5, 1.5]
+    assert weeks["cumulative_total_cases_max"].tolist() == [5, 8]
+
+
+def test_monthly_rollup_of_a_month_without_values_is_nan():
+    df = _daily(["2020-03-31", "2020-04-01", "2020-04-02"], [4.0, np.nan, np.nan])
+    months = worldometer._aggregate(df, "monthly").loc["France"]
+    assert months.index.strftime("%Y-%m-%d").tolist() == ["2020-03-01", "2020-04-01"]
+    assert months["daily_new_cases_sum"].iloc[0] == 4
+    assert np.isnan(months["daily_new_cases_sum"].iloc[1])  # not a real-looking 0
+
+
+def test_health_frame_reads_the_default_stat(monkeypatch):
+    table = worldometer._aggregate(_daily(["2020-03-02", "2020-03-03"], [1.0, 2.0]), "weekly")
+    monkeypatch.setattr(registry, "get", lambda name: table)
+    rows = worldometer.health_frame(["France", "Atlantis"], "daily_new_cases", "weekly")
+    assert list(rows.columns) == ["date", "country", "daily_new_cases"]
+    assert rows["daily_new_cases"].tolist() == [3]
+    rows = worldometer.health_frame(["France"], "daily_new_cases", "weekly", stat="max")
+    assert rows["daily_new_cases"].tolist() == [2]
+    assert worldometer.health_frame(["Atlantis"], "daily_new_cases", "weekly").empty
@@ -0,0 +1,13 @@
+# wsgi.py: WSGI entry point for production servers
+#
+# `python app.py` runs Dash's single-process development server. In
+# production run several workers behind gunicorn instead:
+#
+#     gunicorn -c gunicorn.conf.py wsgi:server
+#
+# gunicorn.conf.py snapshots the datasets once so every worker shares them.
+
+from app import app, start_services
+
+start_services()
+server = app.server